@@ -8,7 +8,7 @@
         4.client PLC链接管理初始化
         5.PLCTagManger单实例类初始化
         6.monitor_handle监听回调函数注册
-        7.利用apscheduler里的 BackgroundScheduler管理 后台tag的批量异步读写 进程调用
+        7.后台线程按固定周期执行tag的批量异步读写
         8.为外部程序提供标签读写的服务，restful接口
         ...
 """
@@ -16,92 +16,87 @@ import logging
 import sys
 import time
 
-from apscheduler.events import EVENT_JOB_EXECUTED, EVENT_JOB_ERROR
-from apscheduler.schedulers.background import BackgroundScheduler
-from apscheduler.triggers.interval import IntervalTrigger
 from gateway.plc.client import PLCClient
 from gateway.plc.log import AppLogger
-from gateway.plc.tags_manager import DBPLCTagManager
+from gateway.plc.tags_manager import DBPLCTagManager, TagDef
 
-from gateway.config.globals import PLC
+import gateway.config.globals as PLC
 import monitor_handler_register as PlcMonitorHandler
 
-def load_tags_conf(config_db_path):
-    import sqlite3
-    # 连接到数据库（如果不存在会自动创建）
-    conn = sqlite3.connect(config_db_path)
+# 标签配置查询：显式列投影，列顺序与别名与 TagDef 的字段一一对应
+TAGS_CONF_SQL = (
+    'SELECT plc, "group", tagpath, name, "desc" AS description, default_value, config_monitor, '
+    'data_type, db_number, byte_offset AS start_offset, bit_index, size FROM config_plc_tags'
+)
+
+# 标签配置库连接参数（均为连接级设置，不改写数据库文件本身）
+TAGS_CONF_PRAGMAS = """
+    PRAGMA query_only = 1;
+    PRAGMA cache_size = -20000;
+    PRAGMA mmap_size = 268435456;
+    PRAGMA temp_store = MEMORY;
+"""
 
-    # 创建游标对象
-    cursor = conn.cursor()
+# 各数据类型占用的字节数（string 的长度取配置值）
+TYPE_LEN = {
+    "bool": 1,
+    "int": 2,
+    "dint": 4,
+    "real": 4,
+    "lreal": 8,
+    "string": None
+}
 
-    # 执行SQL查询
-    cursor.execute("SELECT * FROM config_plc_tags")
 
-    # 获取所有数据
-    rows = cursor.fetchall()
+def load_tags_conf(config_db_path):
+    import sqlite3
+    # 以只读+不可变方式打开配置库（文件不存在时直接报错，不会自动创建空库），
+    # 运行期间配置库不会被修改，SQLite 可跳过文件锁和变更计数检查
+    db_uri = "file:" + config_db_path.replace("\\", "/") + "?mode=ro&immutable=1"
+    conn = sqlite3.connect(
+        db_uri,
+        uri=True,
+        isolation_level=None,
+        cached_statements=100
+    )
+    # 连接级参数：禁止写入、加大页缓存、启用内存映射、临时表放内存
+    conn.executescript(TAGS_CONF_PRAGMAS)
+
+    # 执行SQL查询，按批次拉取结果集
+    cursor = conn.execute(TAGS_CONF_SQL)
+    cursor.arraysize = 500
 
     tags = []
-    # 遍历结果
-    for row in rows:
-        tag = {}
-        plc = row[1]
-        group = row[2]
-        tagpath = row[3]
-        name = row[4]
-        desc = row[5]
-        default_value = row[6]
-        config_monitor = row[7]
-        data_type = row[8].replace(" ", "").lower()
-        db_number = row[9]
-        byte_offset = row[10]
-        bit_index = row[11]
-        size = row[12]
-
-        TYPE_LEN = {
-            "bool": 1,
-            "int": 2,
-            "dint": 4,
-            "real": 4,
-            "lreal": 8,
-            "string": size
-        }
-
-        if data_type not in TYPE_LEN:
-            PLC.LOG.error(f"标签[{tagpath}]数据类型[{data_type}]配置错误，不在[bool,int,dint,real,lreal,string]范围！")
-            sys.exit(0)
-
-        if data_type == "bool" and bit_index not in [0,1,2,3,4,5,6,7]:
-            PLC.LOG.error(f"标签[{tagpath}]数据bit_index = {bit_index} 配置错误，不在[0~7]范围！")
-            sys.exit(0)
-
-        if db_number < 1:
-            PLC.LOG.error(f"标签[{tagpath}]数据db_number = {db_number} 配置错误，不在合法范围！")
-            sys.exit(0)
-
-        if byte_offset < 0:
-            PLC.LOG.error(f"标签[{tagpath}]数据byte_offset = {byte_offset} 配置错误，不在合法范围！")
-            sys.exit(0)
-
-        if config_monitor not in [0 , 1]:
-            PLC.LOG.error(f"标签[{tagpath}]数据config_monitor = {config_monitor} 配置错误，不在[0,1]合法范围内！")
-            sys.exit(0)
-
-        size = TYPE_LEN[data_type]
-
-
-        tag['plc'] = plc
-        tag['group'] = group
-        tag['tagpath'] = tagpath
-        tag['name'] = name
-        tag['description'] = desc
-        tag['default_value'] = default_value
-        tag['config_monitor'] = config_monitor
-        tag['data_type'] = data_type
-        tag['db_number'] = db_number
-        tag['start_offset'] = byte_offset
-        tag['bit_index'] = bit_index
-        tag['size'] = size
-        tags.append(tag)
+    # 分批遍历结果
+    while (chunk := cursor.fetchmany()):
+        for (plc, group, tagpath, name, description, default_value, config_monitor,
+             data_type, db_number, byte_offset, bit_index, size) in chunk:
+            data_type = data_type.replace(" ", "").lower()
+
+            if data_type not in TYPE_LEN:
+                PLC.LOG.error(f"标签[{tagpath}]数据类型[{data_type}]配置错误，不在[bool,int,dint,real,lreal,string]范围！")
+                sys.exit(0)
+
+            if data_type == "bool" and bit_index not in [0,1,2,3,4,5,6,7]:
+                PLC.LOG.error(f"标签[{tagpath}]数据bit_index = {bit_index} 配置错误，不在[0~7]范围！")
+                sys.exit(0)
+
+            if db_number < 1:
+                PLC.LOG.error(f"标签[{tagpath}]数据db_number = {db_number} 配置错误，不在合法范围！")
+                sys.exit(0)
+
+            if byte_offset < 0:
+                PLC.LOG.error(f"标签[{tagpath}]数据byte_offset = {byte_offset} 配置错误，不在合法范围！")
+                sys.exit(0)
+
+            if config_monitor not in [0 , 1]:
+                PLC.LOG.error(f"标签[{tagpath}]数据config_monitor = {config_monitor} 配置错误，不在[0,1]合法范围内！")
+                sys.exit(0)
+
+            if data_type != "string":
+                size = TYPE_LEN[data_type]
+            tags.append(TagDef(plc, group, tagpath, name, description, default_value, config_monitor,
+                               data_type, db_number, byte_offset, bit_index, size))
     # 关闭连接
     conn.close()
     return tags
@@ -119,23 +114,46 @@ def creat_plc_client(plc_conf_path, logger, heartbeat = False):
 
 
 
+class Phase:
+    """初始化阶段计时：每个阶段结束时只输出一条带耗时的结构化日志"""
+
+    def __init__(self, name):
+        self.name = name
+        self.start = 0.0
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        elapsed_ms = (time.perf_counter() - self.start) * 1000
+        if PLC.LOG is not None:
+            if exc_type is None:
+                PLC.LOG.info("phase=%s elapsed_ms=%.1f", self.name, elapsed_ms)
+            else:
+                PLC.LOG.error("phase=%s elapsed_ms=%.1f failed=%s", self.name, elapsed_ms, exc_val)
+        return False
+
+
 def init():
     """
     ################################################# 1. #######################################################
     日志文件初始化
     """
-    # 针对PLC链接管理的日志 记录链接的健康检测和底层读写相关记录
-    logger_plc_client_sync = creat_log('plc_client_sync.log', "logs/client")
-    logger_plc_client_async = creat_log('plc_client_async.log', "logs/client")
-    # 记录tag的创建 tags批量异步读写结果 tag值变换的监听处理
-    logger_tag_manager = creat_log('tags_manager.log', "logs/tags_manager")
-    # 记录消费者线程 处理监听任务的业务逻辑过程日志
-    logger_monitor_handler = creat_log('monitor_handler.log', "logs/monitor_handler")
-    # 记录外部程序调用的记录
-    logger_external_api = creat_log('external_api.log', "logs/external_api")
-    PLC.LOG_PLC_API = logger_external_api
-    # 创建一个通用的应用级日志
-    PLC.LOG = creat_log('app.log', "logs/app")
+    init_start = time.perf_counter()
+    with Phase("log_init"):
+        # 针对PLC链接管理的日志 记录链接的健康检测和底层读写相关记录
+        logger_plc_client_sync = creat_log('plc_client_sync.log', "logs/client")
+        logger_plc_client_async = creat_log('plc_client_async.log', "logs/client")
+        # 记录tag的创建 tags批量异步读写结果 tag值变换的监听处理
+        logger_tag_manager = creat_log('tags_manager.log', "logs/tags_manager")
+        # 记录消费者线程 处理监听任务的业务逻辑过程日志
+        logger_monitor_handler = creat_log('monitor_handler.log', "logs/monitor_handler")
+        # 记录外部程序调用的记录
+        logger_external_api = creat_log('external_api.log', "logs/external_api")
+        PLC.LOG_PLC_API = logger_external_api
+        # 创建一个通用的应用级日志
+        PLC.LOG = creat_log('app.log', "logs/app")
 
     PLC.LOG.info("=============== 初始化程序执行开始 ================")
     """
@@ -143,84 +161,58 @@ def init():
     PLC1进行初始化,建立两个链接 分别用于后台周期异步读写  和业务逻辑相应时的同步实时读写
     并向全局传出一个Client同步读写链接
     """
-    client_plc1_sync = creat_plc_client("config/PLC1_CONF.ini", logger_plc_client_sync, heartbeat = True)
-    client_plc1_async = creat_plc_client("config/PLC1_CONF.ini", logger_plc_client_async)
-    # 给应用程序一个全局的读写链接
-    PLC.S7 = client_plc1_sync
-
-    PLC.LOG.info("... S7异步/同步读写链接已建立 ...")
+    with Phase("s7_connect"):
+        client_plc1_sync = creat_plc_client("config/PLC1_CONF.ini", logger_plc_client_sync, heartbeat = True)
+        client_plc1_async = creat_plc_client("config/PLC1_CONF.ini", logger_plc_client_async)
+        # 给应用程序一个全局的读写链接
+        PLC.S7 = client_plc1_sync
 
     """
     ################################################# 3. #######################################################
     PLC1的TAG导入；
     PLCTagManger 单实例初始化 并传出TAGS管理器
     """
-    # 等待客户端链接建立稳定
-    time.sleep(1.0)
-    config_db_path = "config/Database.db"
-    tag_definitions = load_tags_conf(config_db_path)
-    PLC.DB = DBPLCTagManager.initialize(logger_tag_manager, client_plc1_async, client_plc1_sync, tag_definitions)
+    with Phase("s7_ready_wait"):
+        # 等待后台读写链接就绪（已连接则立即返回），超时后继续初始化，由链接监控线程负责重连
+        if not client_plc1_async.ready_event.wait(timeout=2.0):
+            PLC.LOG.warning("... S7异步读写链接未就绪，继续初始化 ...")
+    with Phase("tags_load"):
+        config_db_path = "config/Database.db"
+        tag_definitions = load_tags_conf(config_db_path)
+        PLC.DB = DBPLCTagManager.initialize(logger_tag_manager, client_plc1_async, client_plc1_sync, tag_definitions)
 
-    PLC.LOG.info("... tag标签配置数据已初始化完成 ...")
     """
     ################################################# 4. #######################################################
     monitor_handle监听回调函数注册
     """
-    PlcMonitorHandler.logger = logger_monitor_handler
-    PlcMonitorHandler.handle_registe()
-
-    PLC.LOG.info("... 标签监听handler方法已注册完毕 ...")
+    with Phase("monitor_register"):
+        PlcMonitorHandler.logger = logger_monitor_handler
+        PlcMonitorHandler.handle_registe()
 
     """
     ################################################# 5. #######################################################
     后台任务管理
-    BackgroundScheduler管理
-    例如：后台tag的批量异步读写
+    例如：后台tag的批量异步读写（专用线程，按固定周期执行）
     """
-    def job_listener(event):
-        if event.exception:
-            PLC.LOG.error(f"任务执行失败: {event.exception}")
-        else:
-            PLC.LOG.debug("任务执行成功")
-    try:
-        # 设置 APScheduler 的日志级别为 ERROR，避免输出 SKIPPED 信息
-        logging.getLogger('apscheduler.scheduler').setLevel(logging.ERROR)
-        logging.getLogger('apscheduler.executors.default').setLevel(logging.ERROR)
-
-        # 创建调度器配置
-        scheduler = BackgroundScheduler({
-            'apscheduler.job_defaults.max_instances': 1,  # 允许的最大并发实例数
-            'apscheduler.timezone': 'Asia/Shanghai',  # 设置时区
-        })
-        # 添加任务监听器
-        scheduler.add_listener(job_listener, EVENT_JOB_EXECUTED | EVENT_JOB_ERROR)
-        # 添加定时任务
-        scheduler.add_job(
-            PLC.DB.read_all_tags,
-            trigger=IntervalTrigger(seconds = PLC.ASYNC_RW_INTERVAL),
-            id='plc1_background_read_all_tags',
-            name='PLC1的后台周期读取任务',
-            misfire_grace_time=1,  # 允许的延迟执行时间
-            coalesce=True,  # 合并多次未执行的任务
-            max_instances=1  # 最大并发实例数
-        )
-        # 启动调度器
-        scheduler.start()
-        print(f"plc1_background_read_all_tags定时任务调度器已启动,周期设定{PLC.ASYNC_RW_INTERVAL}s ...")
-        PLC.LOG.info(f"... plc1_background_read_all_tags定时任务调度器已启动,周期设定{PLC.ASYNC_RW_INTERVAL}s...")
-    except Exception as e:
-        print(f"scheduler后台异步读写任务启动失败！！！原因：{e}")
-        PLC.LOG.error(f"错误：scheduler后台异步读写任务启动失败！！！原因：{e}")
+    with Phase("background_read_start"):
+        try:
+            PLC.DB.interval = PLC.ASYNC_RW_INTERVAL
+            PLC.DB.start_background_async_read()
+            print(f"plc1后台周期读取任务已启动,周期设定{PLC.ASYNC_RW_INTERVAL}s ...")
+        except Exception as e:
+            print(f"后台异步读写任务启动失败！！！原因：{e}")
+            PLC.LOG.error(f"错误：后台异步读写任务启动失败！！！原因：{e}")
 
     """
     ################################################# 6. #######################################################
     外部API Server初始化
     """
-    from gateway.plc_api.run import run_api
-    run_api()
-    PLC.LOG.info("... API Service 接口服务已启动 ...")
+    with Phase("api_start"):
+        from gateway.plc_api.run import run_api
+        run_api()
 
-    PLC.LOG.info("=============== 初始化程序执行结束 ================")
+    PLC.LOG.info("=============== 初始化程序执行结束 ================ elapsed_ms=%.1f",
+                 (time.perf_counter() - init_start) * 1000)
 
 if __name__ == '__main__':
     init()
\ No newline at end of file
@@ -1,39 +1,52 @@
-import time
+# 入口模块只导入实例检测所需的轻量模块；业务模块（gateway.*）在实例检测通过后才导入
 import sys
 import os
 import win32api
 import win32event
+import threading
+import time
 from ctypes import windll
-# 导入业务初始化函数
-from gateway.__init__ import init
-
-import gateway.config.globals
 
 # 1. 互斥体名称：显式Local\前缀（本地会话级），GUID保证全局唯一
 # 若需跨管理员/普通权限运行，改为Global\（需管理员身份启动）
 MUTEX_NAME = "Local\\GateWay_唯一标识_8F6F0AC4-9030-11D1-9191-006008029A37"
-# 2. 全局变量存储互斥体句柄：防止Python垃圾回收提前销毁句柄（核心）
+# 控制台窗口标题：按标题查找窗口的兜底方式依赖此值
+WINDOW_TITLE = "GateWay控制台"
+# OpenEvent 仅需置位权限；AllowSetForegroundWindow 允许任意进程抢占前台
+EVENT_MODIFY_STATE = 0x0002
+ASFW_ANY = -1
+# 2. 全局变量存储单实例事件句柄：防止Python垃圾回收提前销毁句柄（核心）
 g_mutex_handle = None
+# 3. 程序退出事件：主线程阻塞等待，Ctrl+C/关闭控制台时置位
+g_shutdown_event = threading.Event()
 
 def is_already_running():
-    """检测是否已有实例运行（修复所有问题+增强健壮性）"""
+    """检测是否已有实例运行；已有实例时通知其将窗口置顶"""
     global g_mutex_handle
     # 固定错误码：183是Windows系统中"对象已存在"的常量（替代win32con.ERROR_ALREADY_EXISTS）
     ERROR_ALREADY_EXISTS = 183
 
     try:
-        # 创建互斥体：第二个参数False表示非初始拥有者
-        g_mutex_handle = win32event.CreateMutex(None, False, MUTEX_NAME)
+        # 快速路径：命名事件已存在说明已有实例，直接打开并置位，通知其窗口置顶
+        try:
+            peer_handle = win32event.OpenEvent(EVENT_MODIFY_STATE, False, MUTEX_NAME)
+        except win32api.error:
+            peer_handle = None
+        if peer_handle is not None:
+            notify_running_instance(peer_handle)
+            return True
+
+        # 创建命名事件（自动复位、初始无信号）：既作单实例标识，又作"激活窗口"的通知通道
+        g_mutex_handle = win32event.CreateEvent(None, False, False, MUTEX_NAME)
         # 关键：立即获取错误码，中间不插入任何代码（防止错误码被系统重置）
         last_error = win32api.GetLastError()
 
         # 调试信息（打包后可注释，方便排查）
-        print(f"[启动前检测] 互斥体检测码：{last_error}（{ERROR_ALREADY_EXISTS}=已存在，0=新建）")
+        print(f"[启动前检测] 单实例事件检测码：{last_error}（{ERROR_ALREADY_EXISTS}=已存在，0=新建）")
 
-        # 核心判断：直接使用固定错误码，彻底摆脱win32con依赖
+        # 两个进程同时启动时 OpenEvent 都可能失败，以 CreateEvent 的错误码为准
         if last_error == ERROR_ALREADY_EXISTS:
-            # 已有实例：关闭句柄，返回True
-            win32api.CloseHandle(g_mutex_handle)
+            notify_running_instance(g_mutex_handle)
             g_mutex_handle = None  # 重置全局变量
             return True
         # 新实例：保留句柄，返回False
@@ -41,45 +54,124 @@ def is_already_running():
 
     # 精细化异常捕获：区分不同异常类型，避免无脑误判
     except win32api.error as e:
-        # 仅捕获Windows系统级互斥体错误（如权限不足、名称无效）
-        print(f"[错误] 创建互斥体时发生系统错误：{e}")
+        # 仅捕获Windows系统级错误（如权限不足、名称无效）
+        print(f"[错误] 创建单实例事件时发生系统错误：{e}")
         return True  # 系统错误时阻止多开
     except Exception as e:
         # 捕获其他非致命异常（如代码笔误、属性错误）
         print(f"[警告] 实例检测时发生非致命异常：{type(e).__name__}: {e}")
         return False  # 不阻止程序启动，避免误判
 
-def bring_window_to_front(window_title="GateWay控制台"):
-    """将已运行的控制台窗口置顶（可选，不影响核心逻辑）"""
+def notify_running_instance(event_handle):
+    """通知已运行的实例将自身窗口置顶，并关闭本进程持有的事件句柄"""
     try:
-        # 查找窗口（根据标题，需与实际窗口标题匹配）
+        # 前台窗口归本进程所有，需显式授权其他进程抢占前台，否则对方 SetForegroundWindow 会失败
+        windll.user32.AllowSetForegroundWindow(ASFW_ANY)
+        win32event.SetEvent(event_handle)
+    except Exception as e:
+        print(f"[警告] 通知已运行实例失败：{e}")
+    finally:
+        win32api.CloseHandle(event_handle)
+
+def find_window(window_title, retries=20, interval=0.1):
+    """按标题查找窗口；窗口可能尚未创建或标题尚未设置，短暂重试"""
+    for _ in range(retries):
         hwnd = windll.user32.FindWindowW(None, window_title)
         if hwnd:
-            windll.user32.ShowWindow(hwnd, 9)  # SW_RESTORE：恢复最小化窗口
-            windll.user32.SetForegroundWindow(hwnd)  # 置顶窗口
+            return hwnd
+        time.sleep(interval)
+    return 0
+
+def bring_window_to_front(window_title=WINDOW_TITLE):
+    """将本进程的控制台窗口置顶（可选，不影响核心逻辑）"""
+    try:
+        # 优先直接取本进程控制台窗口句柄，取不到时再按标题查找
+        hwnd = windll.kernel32.GetConsoleWindow() or find_window(window_title)
+        if hwnd:
+            # 一次调用完成恢复最小化/保持最大化并置顶
+            windll.user32.SwitchToThisWindow(hwnd, True)
     except Exception as e:
         print(f"[警告] 置顶窗口失败：{e}")
 
+def watch_activate_requests():
+    """后台线程：等待其他实例的激活通知，收到后将本进程窗口置顶"""
+    while True:
+        rc = win32event.WaitForSingleObject(g_mutex_handle, win32event.INFINITE)
+        if rc != win32event.WAIT_OBJECT_0:
+            # 句柄已关闭（程序退出中），结束监听
+            break
+        bring_window_to_front()
+
+def on_console_ctrl(ctrl_type):
+    """控制台控制事件回调（Ctrl+C、Ctrl+Break、关闭窗口等），由系统在独立线程中调用"""
+    g_shutdown_event.set()
+    return True
+
+def release_mutex():
+    """释放单实例事件句柄"""
+    global g_mutex_handle
+    if g_mutex_handle is not None:
+        win32api.CloseHandle(g_mutex_handle)
+        g_mutex_handle = None
+
+def log_duplicate_launch():
+    """重复启动时记录到回滚日志文件（不写控制台，不依赖业务日志模块）"""
+    import logging
+    from logging.handlers import RotatingFileHandler
+    try:
+        log_dir = os.path.join("logs", "app")
+        os.makedirs(log_dir, exist_ok=True)
+        handler = RotatingFileHandler(os.path.join(log_dir, "launch.log"),
+                                      maxBytes=1024 * 1024, backupCount=3, encoding='utf-8')
+        handler.setFormatter(logging.Formatter('%(asctime)s - %(levelname)s - %(message)s'))
+        logger = logging.getLogger("launch")
+        logger.addHandler(handler)
+        logger.warning("程序已在运行中，已通知运行实例置顶窗口，本次启动退出（pid=%d）", os.getpid())
+        handler.close()
+    except Exception:
+        # 日志失败不影响退出
+        pass
+
+def flush_logs():
+    """写完日志队列中剩余的日志（os._exit 不会执行 atexit 中注册的清理）"""
+    try:
+        from gateway.plc.log import stop_logging
+        stop_logging()
+    except Exception:
+        pass
+
 def main():
     """主程序入口（优化逻辑结构，分离检测与业务）"""
     # 第一步：先执行实例检测（移出try块，避免被业务逻辑异常干扰）
     if is_already_running():
-        print("程序已在运行中！即将退出...")
-        bring_window_to_front()
-        # 强制终止进程（os._exit比sys.exit更彻底，适用于打包后的EXE）
-        input("按回车退出...")
+        log_duplicate_launch()
+        # 直接退出，不等待按键：自启动/计划任务拉起的重复进程不能阻塞（os._exit比sys.exit更彻底，适用于打包后的EXE）
         os._exit(0)
 
     # 第二步：执行业务逻辑（单独包裹异常处理）
     try:
         print("程序启动成功，唯一实例运行中...")
+        # 业务初始化函数在实例检测通过后再导入，重复启动的进程无需承担业务模块的导入开销
+        from gateway.__init__ import init
+        win32api.SetConsoleTitle(WINDOW_TITLE)
+        # 监听其他实例发来的激活通知
+        threading.Thread(target=watch_activate_requests, name="activate-watcher", daemon=True).start()
+        # 注册控制台退出回调：Windows下 Event.wait() 无法被 Ctrl+C 中断，由回调线程置位退出事件
+        win32api.SetConsoleCtrlHandler(on_console_ctrl, True)
         init()  # 业务初始化逻辑
-        # 模拟主循环（替换为你的实际业务逻辑）
-        while True:
-            time.sleep(2)
-            # print(time.strftime("%Y-%m-%d %H:%M:%S", time.localtime()))
+        # 主线程阻塞等待退出事件，不再周期性唤醒
+        g_shutdown_event.wait()
+        print("收到退出信号，程序正在退出...")
+        import gateway.config.globals as PLC
+        if PLC.DB is not None:
+            PLC.DB.stop_background_async_read()
+        # 关闭 API 链接池中的PLC链接
+        from gateway.plc_api.app.plc_pool import close_pool
+        close_pool()
+        release_mutex()
     except Exception as e:
         print(f"[错误] 程序异常退出：{e}")
+        flush_logs()
         input("按回车退出...")
         os._exit(1)
 
@@ -18,20 +18,23 @@ THREAD_	线程相关	    THREAD_POOL	        线程或线程池相关的变量
 [前缀]_[模块/领域]_[描述性名称]_[类型后缀?]
 
 """
+from typing import Optional
+
 from gateway.plc.client import PLCClient
 from gateway.plc.log import AppLogger
 from gateway.plc.tags_manager import DBPLCTagManager
 
-class PLC:
-# 后台异步批量读写周期 默认0.2s
-    ASYNC_RW_INTERVAL = 0.2
+# 本模块即全局命名空间，使用方式：import gateway.config.globals as PLC，之后按 PLC.DB / PLC.LOG 访问
+# （模块属性只需一次字典查找，初始化时对 PLC.xxx 的赋值对所有导入方可见）
 
-    # S7同步读写链接
-    S7: PLCClient
-    # 标签管理 可以直接或取标签，或直接利用标签属性读写标签
-    DB: DBPLCTagManager
-    # 通用日志记录
-    LOG: AppLogger
-    # 外部API接口日志
-    LOG_PLC_API: AppLogger
+# 后台异步批量读写周期 默认0.2s
+ASYNC_RW_INTERVAL = 0.2
 
+# S7同步读写链接
+S7: Optional[PLCClient] = None
+# 标签管理 可以直接或取标签，或直接利用标签属性读写标签
+DB: Optional[DBPLCTagManager] = None
+# 通用日志记录
+LOG: Optional[AppLogger] = None
+# 外部API接口日志
+LOG_PLC_API: Optional[AppLogger] = None
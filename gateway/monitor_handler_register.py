@@ -43,38 +43,40 @@ def plc_data_read_thread():
 #############################################
 ##  以下是实际需要自定义的业务处理逻辑  ##
 #############################################
-
+import logging
 
 from gateway.plc.log import AppLogger
 from gateway.plc.monitor import VariableEvent, EdgeType
-from gateway.config.globals import PLC
+import gateway.config.globals as PLC
 
 
 logger:AppLogger
 
 # 定义事件处理函数
 def handle_rising_edge(event: VariableEvent):
-    logger.info(f"处理上升沿事件: {event}")
-    print(f"处理上升沿事件: {event}")
+    if logger.isEnabledFor(logging.INFO):
+        logger.info("处理上升沿事件: %s", event)
 
 
 
 def handle_falling_edge(event: VariableEvent):
-    logger.info(f"处理下降沿事件: {event}")
-    print(f"处理下降沿事件: {event}")
+    if logger.isEnabledFor(logging.INFO):
+        logger.info("处理下降沿事件: %s", event)
 
 
 def handle_change(event: VariableEvent):
-    logger.info(f"处理普通变化事件: {event}")
-    print(f"处理普通变化事件: {event}")
+    if logger.isEnabledFor(logging.INFO):
+        logger.info("处理普通变化事件: %s", event)
 
 
 def handle_registe():
-    tags = PLC.DB.tags
-    for tag in tags:
-        if PLC.DB.tags.get(tag).config_monitor:
-            print(f"注册标签监听：{tag}")
-            logger.info(f"注册标签监听：{tag}")
-            PLC.DB.tags[tag].monitor.register_handler(EdgeType.RISING, handle_rising_edge)
-            #PLC.DB.tags[tag].monitor.register_handler(EdgeType.FALLING,handle_falling_edge)
-            #PLC.DB.tags[tag].monitor.register_change_handler(handle_change)
+    # 循环外绑定局部变量，避免每次迭代重复查找全局名
+    rising = EdgeType.RISING
+    on_rising = handle_rising_edge
+    # 只遍历配置了监听的标签，无需再逐个过滤 config_monitor
+    for tag in PLC.DB.monitored_tags:
+        print(f"注册标签监听：{tag.tagpath}")
+        logger.info(f"注册标签监听：{tag.tagpath}")
+        tag.monitor.register_handler(rising, on_rising)
+        #tag.monitor.register_handler(EdgeType.FALLING,handle_falling_edge)
+        #tag.monitor.register_change_handler(handle_change)
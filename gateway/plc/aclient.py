@@ -0,0 +1,79 @@
+"""
+PLC 异步客户端：为 asyncio 程序提供 PLCClient 读写方法的协程版本
+
+snap7 的 C 客户端是同步阻塞的，这里不重新实现 S7 协议，而是把每次调用交给线程池执行（asyncio.to_thread），
+事件循环不会被阻塞。多个协程同时发起的单值读取会在 PLCClient 的 I/O 工作线程中合并为一次多变量请求。
+
+网关自身（后台读写、API）不使用本模块，供基于 asyncio 的外部程序按需导入。
+"""
+import asyncio
+
+from gateway.plc.client import PLCClient
+
+
+class AsyncPLCClient:
+    """
+    PLCClient 的异步外观，返回值与同步方法一致：读取返回 (成功状态, 值)，写入返回成功状态
+    """
+
+    def __init__(self, client: PLCClient) -> None:
+        self.client = client
+
+    async def _call(self, func, *args):
+        return await asyncio.to_thread(func, *args)
+
+    async def wait_for_connection(self, timeout=2):
+        return await self._call(self.client.wait_for_connection, timeout)
+
+    # -------------------------- 读取 --------------------------
+    async def read_bit(self, db_num: int, byte_offset: int, bit_offset: int):
+        return await self._call(self.client.readDB_Bit, db_num, byte_offset, bit_offset)
+
+    async def read_int(self, db_num: int, byte_offset: int):
+        return await self._call(self.client.readDB_Int, db_num, byte_offset)
+
+    async def read_dint(self, db_num: int, byte_offset: int):
+        return await self._call(self.client.readDB_DInt, db_num, byte_offset)
+
+    async def read_real(self, db_num: int, byte_offset: int):
+        return await self._call(self.client.readDB_Real, db_num, byte_offset)
+
+    async def read_lreal(self, db_num: int, byte_offset: int):
+        return await self._call(self.client.readDB_LReal, db_num, byte_offset)
+
+    async def read_string(self, db_num: int, byte_offset: int, size: int, encoding='gbk'):
+        return await self._call(self.client.readDB_String, db_num, byte_offset, size, encoding)
+
+    async def read_bytes(self, db_num: int, byte_offset: int, size: int):
+        return await self._call(self.client.readDB_Byte, db_num, byte_offset, size)
+
+    async def read_multi(self, items: list, encoding='gbk'):
+        return await self._call(self.client.readDB_Multi, items, encoding)
+
+    # -------------------------- 写入 --------------------------
+    async def write_bit(self, db_num: int, byte_offset: int, bit_offset: int, value: bool):
+        return await self._call(self.client.writeDB_Bit, db_num, byte_offset, bit_offset, value)
+
+    async def write_int(self, db_num: int, byte_offset: int, value: int):
+        return await self._call(self.client.writeDB_Int, db_num, byte_offset, value)
+
+    async def write_dint(self, db_num: int, byte_offset: int, value: int):
+        return await self._call(self.client.writeDB_DInt, db_num, byte_offset, value)
+
+    async def write_real(self, db_num: int, byte_offset: int, value: float):
+        return await self._call(self.client.writeDB_Real, db_num, byte_offset, value)
+
+    async def write_lreal(self, db_num: int, byte_offset: int, value: float):
+        return await self._call(self.client.writeDB_LReal, db_num, byte_offset, value)
+
+    async def write_string(self, db_num: int, byte_offset: int, size: int, value: str):
+        return await self._call(self.client.writeDB_String, db_num, byte_offset, size, value)
+
+    async def write_bytes(self, db_num: int, byte_offset: int, data: bytearray):
+        return await self._call(self.client.writeDB_Byte, db_num, byte_offset, data)
+
+    async def write_multi(self, items: list, encoding='gbk'):
+        return await self._call(self.client.writeDB_Multi, items, encoding)
+
+    async def close(self):
+        await self._call(self.client.close)
@@ -1,12 +1,163 @@
 import os
 import time
+import logging
 import threading
+import queue
+import weakref
+from concurrent.futures import Future
 import configparser
+import ctypes
+import struct
+from array import array
+from functools import lru_cache
+from typing import NamedTuple, Optional
 import snap7
 from snap7 import util
+from snap7.error import check_error
+from snap7.type import S7DataItem, Area, WordLen
 from  gateway.plc import log
 
 
+# 各位的掩码，位读写直接做位运算，不经过 snap7.util 的 get_bool/set_bool
+_BIT_MASKS = tuple(1 << i for i in range(8))
+
+
+class _PLCConfig(NamedTuple):
+    """PLC 链接配置（只读），同一配置文件只解析一次"""
+    plc_ip: str
+    plc_rack: int
+    plc_slot: int
+    plc_port: int
+    check_interval: int
+    db_number: int
+    byte_offset: int
+    bit_index: int
+    deep_check_every: int
+    cpu_affinity: int
+
+
+@lru_cache(maxsize=None)
+def _load_conf(config_path: str) -> _PLCConfig:
+    """解析 INI 配置文件，按路径缓存：共用同一配置文件的多个链接不会重复解析"""
+    if not os.path.exists(config_path):
+        raise FileNotFoundError(f"配置文件不存在: {config_path}")
+
+    config = configparser.ConfigParser()
+    config.read(config_path, encoding='utf-8')
+
+    return _PLCConfig(
+        plc_ip=config.get('PLC', 'ip', fallback='192.168.0.1'),
+        plc_rack=config.getint('PLC', 'rack', fallback=0),
+        plc_slot=config.getint('PLC', 'slot', fallback=1),
+        plc_port=config.getint('PLC', 'port', fallback=102),
+        check_interval=config.getint('MONITOR', 'check_interval', fallback=2),
+        db_number=config.getint('MONITOR', 'db_number', fallback=1),
+        byte_offset=config.getint('MONITOR', 'byte_offset', fallback=1),
+        bit_index=config.getint('MONITOR', 'bit_index', fallback=0),
+        # 每隔多少个检测周期做一次真实读取的深度检测，其余周期只查询本地链接状态
+        deep_check_every=config.getint('MONITOR', 'deep_check_every', fallback=5),
+        # 监控/心跳线程绑定的CPU核心编号，-1 表示不绑定（仅支持 os.sched_setaffinity 的平台生效）
+        cpu_affinity=config.getint('MONITOR', 'cpu_affinity', fallback=-1),
+    )
+
+
+def _close_snap7_client(client):
+    """对象被回收或解释器退出时释放 snap7 链接（只断开链接，不等待任何线程）"""
+    try:
+        client.disconnect()
+        client.destroy()
+    except Exception:
+        pass
+
+
+class TagGroup:
+    """
+    一组需要周期轮询的变量（结构数组布局）
+        各属性按变量下标平行存放在紧凑数组中，构建时按 (db_num, byte_offset) 排序并合并地址连续的变量为读取段，
+        PLCClient.poll_group 每段一次 db_read，结果写入复用的输出缓冲区，按变量下标解析
+    """
+
+    # 数据类型编码
+    TYPE_CODES = {"bool": 0, "int": 1, "dint": 2, "real": 3, "lreal": 4, "string": 5}
+    TYPE_SIZES = {"bool": 1, "int": 2, "dint": 4, "real": 4, "lreal": 8}
+
+    def __init__(self, items: list):
+        """
+        items: [(db_num, byte_offset, data_type, size, bit_index), ...]，string 的 size 为字符串最大长度
+        """
+        count = len(items)
+        self.db_nums = array('H', [0]) * count
+        self.offsets = array('I', [0]) * count
+        self.sizes = array('H', [0]) * count
+        self.types = array('B', [0]) * count
+        self.bit_indexes = array('B', [0]) * count
+        # 各变量在输出缓冲区中的起始位置
+        self.dtype_offset = array('I', [0]) * count
+
+        for i, (db_num, byte_offset, data_type, size, bit_index) in enumerate(items):
+            self.db_nums[i] = db_num
+            self.offsets[i] = byte_offset
+            self.sizes[i] = size + 2 if data_type == "string" else self.TYPE_SIZES[data_type]
+            self.types[i] = self.TYPE_CODES[data_type]
+            self.bit_indexes[i] = bit_index or 0
+
+        # 按 (db_num, byte_offset) 排序后合并连续（或重叠）地址为读取段：[(db_num, start, size, 缓冲区位置), ...]
+        order = sorted(range(count), key=lambda i: (self.db_nums[i], self.offsets[i]))
+        self.runs = []
+        position = 0
+        run_db = run_start = run_end = None
+        for i in order:
+            db_num, start, end = self.db_nums[i], self.offsets[i], self.offsets[i] + self.sizes[i]
+            if run_db != db_num or start > run_end:
+                if run_db is not None:
+                    self.runs.append((run_db, run_start, run_end - run_start, position))
+                    position += run_end - run_start
+                run_db, run_start, run_end = db_num, start, end
+            else:
+                run_end = max(run_end, end)
+            self.dtype_offset[i] = position + start - run_start
+        if run_db is not None:
+            self.runs.append((run_db, run_start, run_end - run_start, position))
+            position += run_end - run_start
+
+        # 输出缓冲区，每个轮询周期复用
+        self.buffer = bytearray(position)
+        self.view = memoryview(self.buffer)
+
+    def __len__(self):
+        return len(self.types)
+
+    def get_bool(self, i: int) -> bool:
+        return bool(self.buffer[self.dtype_offset[i]] >> self.bit_indexes[i] & 1)
+
+    def get_int(self, i: int) -> int:
+        return util.get_int(self.buffer, self.dtype_offset[i])
+
+    def get_dint(self, i: int) -> int:
+        return util.get_dint(self.buffer, self.dtype_offset[i])
+
+    def get_real(self, i: int) -> float:
+        return util.get_real(self.buffer, self.dtype_offset[i])
+
+    def get_lreal(self, i: int) -> float:
+        return util.get_lreal(self.buffer, self.dtype_offset[i])
+
+    def get_string(self, i: int, encoding='gbk') -> str:
+        position = self.dtype_offset[i]
+        string_bytes = bytes(self.buffer[position + 2:position + 2 + self.buffer[position + 1]])
+        try:
+            return string_bytes.decode(encoding)
+        except UnicodeDecodeError:
+            # 尾部半个中文字符的问题，去掉末尾一个字节重新解码
+            return string_bytes[:-1].decode(encoding, errors='ignore')
+
+    def get(self, i: int):
+        """按变量类型解析第 i 个变量的值"""
+        return self._getters[self.types[i]](self, i)
+
+    _getters = (get_bool, get_int, get_dint, get_real, get_lreal, get_string)
+
+
 class PLCClient:
     """
     作者：尉
@@ -14,32 +165,73 @@ class PLCClient:
     PLC 客户端类，支持多线程安全访问（通过互斥锁实现）
     """
 
-    connect_lock = threading.RLock()  # 单PLC链接建立 操作的互斥锁，避免并发链接报错
-
-    def __init__(self, config_path: str, logger: log.AppLogger, heart: bool = False) -> None:
+    # 固定实例属性，不使用 __dict__（__weakref__ 供 weakref.finalize 使用）
+    __slots__ = (
+        'logger', 'config_path', 'client', 'connect_lock', '_link_checked_at', '_finalizer',
+        'connected', '_reconnect_delay', 'monitor_thread', 'stop_monitor', '_check_count', 'ready_event', '_connected_event',
+        'client_lock', 'connect_timeout', 'lock_timeout', 'pdu_size', '_scratch2', '_scratch4', '_scratch8',
+        '_req_q', '_io_thread', '_read_cache', '_read_cache_gen', 'read_cache_ttl', 'heart', 'heart_thread', 'stop_heart',
+        'plc_ip', 'plc_rack', 'plc_slot', 'plc_port', 'check_interval', 'db_number', 'byte_offset',
+        'bit_index', 'deep_check_every', 'cpu_affinity', '__weakref__',
+    )
+
+    # 读写耗时统计开关：打开后各读写方法记录耗时，超过0.2秒输出警告，便于排查网络问题
+    TIMING_ENABLED = False
+    LINK_CACHE_TTL = 0.05  # 链接状态缓存有效期（秒），有效期内 connect() 不再重复查询 snap7
+    RECONNECT_DELAY_MIN = 0.05  # 重连退避的初始等待时间（秒）
+    RECONNECT_DELAY_MAX = 2.0  # 重连退避的最大等待时间（秒）
+
+    def __init__(self, config_path: str, logger: log.AppLogger, heart: bool = False, monitor: bool = True) -> None:
         """
         参数
         config_path:str 配置文件相对路径
         logger:log.AppLogger 日志存储
         heart = False 是否配置PLC心跳(一个PLC只需要开一个)
+        monitor = True 是否启动链接监控线程；不启动时由使用方在使用前调用 ensure_connected()
         """
         self.logger = logger
         
         self.config_path = config_path
         self.client = None
+        # 本实例链接建立/断开的互斥锁，避免并发链接报错（实例级，不同PLC链接之间互不阻塞）
+        self.connect_lock = threading.Lock()
+        # 最近一次确认链接正常的时间（monotonic），用于 connect() 的免锁快速返回
+        self._link_checked_at = 0.0
+        # 当前 snap7 链接的终结器：对象被回收时兜底断开链接
+        self._finalizer = None
         self.connected = False
+        self._reconnect_delay = self.RECONNECT_DELAY_MIN  # 当前重连退避时间，重连成功后复位
         self.monitor_thread = None
-        self.stop_monitor = False
+        self.stop_monitor = threading.Event()  # 置位即通知监控线程退出，并立即唤醒其等待
+        self._check_count = 0  # 链接检测计数，用于确定深度检测的周期
+        # 首次与PLC建立链接后置位，供调用方等待链接就绪
+        self.ready_event = threading.Event()
+        # 链接状态事件：连接成功/恢复时置位，断开/检测失败时清除，读写前等待它而非轮询
+        self._connected_event = threading.Event()
 
         # -------------------------- 关键优化1：初始化互斥锁 --------------------------
-        self.client_lock = threading.RLock()  # 保护 client 操作的互斥锁
+        self.client_lock = threading.Lock()  # 保护 client 操作的互斥锁（各方法不重入，用普通锁即可）
         self.connect_timeout = 5  # 连接等待超时时间（秒）
         self.lock_timeout = 3  # 锁获取超时时间（秒，防止死锁）
+        self.pdu_size = 240  # 协商的PDU大小，连接成功后更新，用于限制多变量读写的单次打包量
+        # 定长写入的复用缓冲区（仅在持有 client_lock 时使用，避免每次写入都分配新对象）
+        self._scratch2 = bytearray(2)
+        self._scratch4 = bytearray(4)
+        self._scratch8 = bytearray(8)
+        # 单值读取请求队列：由唯一的I/O工作线程处理，同时排队的多个读取合并为一次多变量请求
+        self._req_q = queue.Queue()
+        self._io_thread = None
+        # 单值读取结果的短时缓存 {(db, offset, type, size, bit): (值, 读取时刻)}，有效期内相同读取不再访问PLC
+        self._read_cache = {}
+        self._read_cache_gen = 0  # 缓存版本号，每次写入递增，写入前发起的读取结果不再入缓存
+        # 缓存有效期（秒），默认 0 不缓存：只有本实例的写入会使缓存失效，其它链接（同步/异步客户端）写入同一地址后，
+        # 有效期内仍可能读到旧值，只在能接受这一延迟的场合开启
+        self.read_cache_ttl = 0
 
         # 和PLC通讯的心跳开关，一个PLC开一个心跳即可
         self.heart = heart
         self.heart_thread = None
-        self.stop_heart = False
+        self.stop_heart = threading.Event()  # 置位即通知心跳线程退出，并立即唤醒其等待
 
         # 加载配置
         self.load_config()
@@ -47,8 +239,12 @@ class PLCClient:
         # 初始化连接
         self.connect()
 
+        # 启动I/O工作线程
+        self.start_io_worker()
+
         # 启动监控线程
-        self.start_monitor()
+        if monitor:
+            self.start_monitor()
 
         # 心跳线程
         if heart:
@@ -56,22 +252,19 @@ class PLCClient:
 
 
     def load_config(self):
-        """从配置文件加载 PLC 连接参数（无修改）"""
+        """从配置文件加载 PLC 连接参数（同一配置文件只解析一次）"""
         try:
-            if not os.path.exists(self.config_path):
-                raise FileNotFoundError(f"配置文件不存在: {self.config_path}")
-
-            config = configparser.ConfigParser()
-            config.read(self.config_path, encoding='utf-8')
-
-            self.plc_ip = config.get('PLC', 'ip', fallback='192.168.0.1')
-            self.plc_rack = config.getint('PLC', 'rack', fallback=0)
-            self.plc_slot = config.getint('PLC', 'slot', fallback=1)
-            self.plc_port = config.getint('PLC', 'port', fallback=102)
-            self.check_interval = config.getint('MONITOR', 'check_interval', fallback=2)
-            self.db_number = config.getint('MONITOR', 'db_number', fallback=1)
-            self.byte_offset = config.getint('MONITOR', 'byte_offset', fallback=1)
-            self.bit_index = config.getint('MONITOR', 'bit_index', fallback=0)
+            cfg = _load_conf(self.config_path)
+            self.plc_ip = cfg.plc_ip
+            self.plc_rack = cfg.plc_rack
+            self.plc_slot = cfg.plc_slot
+            self.plc_port = cfg.plc_port
+            self.check_interval = cfg.check_interval
+            self.db_number = cfg.db_number
+            self.byte_offset = cfg.byte_offset
+            self.bit_index = cfg.bit_index
+            self.deep_check_every = cfg.deep_check_every
+            self.cpu_affinity = cfg.cpu_affinity
 
             self.logger.info(f"加载 PLC 配置: IP={self.plc_ip}, RACK={self.plc_rack}, "
                         f"SLOT={self.plc_slot}, PORT={self.plc_port}")
@@ -83,19 +276,37 @@ class PLCClient:
 
     def _log_execution_time(self, func_name:str, elapsed, precision=4):
         """
-        记录执行时间
+        记录执行时间（仅 TIMING_ENABLED 打开时调用）
             统计读写超时时间，便于查找网络问题
             """
-        self.logger.debug(f"函数 {func_name} 执行时间: {elapsed:.{precision}f} 秒")
         if elapsed > 0.2:
             self.logger.warning(f"函数 {func_name} 执行时间过长: {elapsed:.{precision}f} 秒")
 
 
+    def _is_link_up(self):
+        """免锁判断链接是否正常：LINK_CACHE_TTL 内复用上次结果，过期后才重新查询 snap7 本地状态"""
+        client = self.client
+        if not (self.connected and client):
+            return False
+        now = time.monotonic()
+        if now - self._link_checked_at < self.LINK_CACHE_TTL:
+            return True
+        try:
+            if client.get_connected():
+                self._link_checked_at = now
+                return True
+        except Exception:
+            pass
+        return False
+
     # -------------------------- 关键优化2：连接方法加锁 --------------------------
     def connect(self):
         """创建并建立 PLC 连接（加锁避免多线程重复连接）"""
+        # 快速路径：链接正常时直接返回，不争用连接锁
+        if self._is_link_up():
+            return True
         # 尝试获取锁，超时则返回失败
-        if not PLCClient.connect_lock.acquire(timeout=3):
+        if not self.connect_lock.acquire(timeout=3):
             self.logger.error("获取连接锁超时，连接失败!")
             return False
 
@@ -107,35 +318,47 @@ class PLCClient:
             self.logger.warning("...尝试重连PLC链接中...")
             # 创建客户端实例
             self.client = snap7.client.Client()
+            self._finalizer = weakref.finalize(self, _close_snap7_client, self.client)
             self.client.connect(self.plc_ip, self.plc_rack, self.plc_slot, self.plc_port)
 
             if self.client.get_connected():
                 self.connected = True
+                self._connected_event.set()
+                self.ready_event.set()
                 pdu_size = self.client.get_pdu_length()
+                self.pdu_size = pdu_size
+                self._link_checked_at = time.monotonic()
                 self.logger.info(f"成功连接到 PLC: {self.plc_ip} 协商PDU大小：{pdu_size}")
                 return True
             else:
                 self.connected = False
+                self._connected_event.clear()
                 self.logger.error(f"连接到 PLC 失败: {self.plc_ip}")
                 return False
 
         except Exception as e:
             self.connected = False
+            self._connected_event.clear()
             self.logger.error(f"连接 PLC 时发生异常: {e}")
             return False
         finally:
             # 无论成功失败，都释放锁
-            PLCClient.connect_lock.release()
+            self.connect_lock.release()
 
     # -------------------------- 关键优化3：断开连接加锁 --------------------------
     def disconnect(self):
         """断开 PLC 连接（加锁保证资源安全释放）"""
-        if not PLCClient.connect_lock.acquire(timeout=3):
+        if not self.connect_lock.acquire(timeout=3):
             self.logger.error("获取断开锁超时，释放资源失败")
             return
 
         try:
+            self._connected_event.clear()
+            self._link_checked_at = 0.0
             if self.client:
+                if self._finalizer is not None:
+                    self._finalizer.detach()
+                    self._finalizer = None
                 self.client.disconnect()
                 self.client.destroy()
                 self.client = None
@@ -144,7 +367,7 @@ class PLCClient:
         except Exception as e:
             self.logger.error(f"断开 PLC 连接时发生异常: {e}")
         finally:
-            PLCClient.connect_lock.release()
+            self.connect_lock.release()
 
     # -------------------------- 关键优化4：连接检查加锁 --------------------------
     def check_connection(self):
@@ -156,16 +379,25 @@ class PLCClient:
             if not self.client:
                 was_connected = self.connected
                 self.connected = False
+                self._connected_event.clear()
                 if was_connected:
                     self.logger.error("PLC 客户端未初始化，连接已断开")
                 return False
 
-            # 尝试读取一个字节来检查连接状态
-            self.client.db_read(self.db_number, self.byte_offset, 1)
+            self._check_count += 1
+            if self.connected and self._check_count % max(self.deep_check_every, 1):
+                # 快速检测：只查询snap7本地的链接状态，不产生报文、不占用PDU
+                if not self.client.get_connected():
+                    raise ConnectionError("snap7 报告链接已断开")
+            else:
+                # 深度检测（每 deep_check_every 个周期一次，或链接尚未恢复时）：读取一个字节确认PLC实际可达
+                self.client.db_read(self.db_number, self.byte_offset, 1)
 
             # 连接正常
             if not self.connected:
                 self.connected = True
+                self._connected_event.set()
+                self.ready_event.set()
                 self.logger.info("PLC 连接已恢复")
             else:
                 self.logger.info("周期性监测PLC连接状态：正常")
@@ -174,6 +406,7 @@ class PLCClient:
         except Exception as e:
             was_connected = self.connected
             self.connected = False
+            self._connected_event.clear()
 
             # 只有状态发生变化时才记录日志，避免重复日志
             if was_connected:
@@ -185,32 +418,57 @@ class PLCClient:
 
 
     def reconnect(self):
-        """尝试重新连接 PLC（无修改，依赖 connect 加锁）"""
+        """尝试重新连接 PLC（依赖 connect 加锁），连续失败时等待时间按指数退避递增"""
 
         self.logger.warning("尝试重新连接 PLC...")
         self.disconnect()
-        time.sleep(0.5)
+        # 等待退避时间，停止监控时立即返回
+        self.stop_monitor.wait(self._reconnect_delay)
+        ok = self.connect()
+        self._reconnect_delay = self.RECONNECT_DELAY_MIN if ok else min(self.RECONNECT_DELAY_MAX, self._reconnect_delay * 2)
+        return ok
+
+    def ensure_connected(self):
+        """
+        供未启动监控线程的链接在使用前调用：按监控线程的方式检测链接（每 deep_check_every 次做一次深度检测），
+        检测失败时立即重连一次（不退避等待），返回链接是否可用
+        """
+        if self.check_connection():
+            return True
+        self.disconnect()
         return self.connect()
 
+    def _pin_current_thread(self):
+        """按配置把当前线程绑定到指定CPU核心，减少线程在核心间迁移；平台不支持或绑定失败时忽略"""
+        if self.cpu_affinity < 0 or not hasattr(os, "sched_setaffinity"):
+            return
+        try:
+            # Linux 下 pid=0 表示调用线程本身
+            os.sched_setaffinity(0, {self.cpu_affinity})
+            self.logger.info(f"线程 {threading.current_thread().name} 已绑定CPU核心 {self.cpu_affinity}")
+        except Exception as e:
+            self.logger.warning(f"线程绑定CPU核心 {self.cpu_affinity} 失败: {e}")
+
     def monitor_task(self):
         """监控任务（无修改，依赖 check_connection 加锁）"""
+        self._pin_current_thread()
         self.logger.info("启动 PLC 连接监控任务")
-        while not self.stop_monitor:
+        while not self.stop_monitor.is_set():
             try:
                 if not self.check_connection():
                     self.reconnect()
-                time.sleep(self.check_interval)
             except Exception as e:
                 self.logger.error(f"链接监控任务发生异常: {e}")
-                time.sleep(self.check_interval)
+            # 等待下一个检测周期，停止时立即返回
+            self.stop_monitor.wait(self.check_interval)
 
     def start_monitor(self):
         """启动监控线程（无修改）"""
         if self.monitor_thread and self.monitor_thread.is_alive():
             self.logger.warning("链接健康监控线程已在运行")
             return
-        self.stop_monitor = False
-        self.monitor_thread = threading.Thread(target=self.monitor_task)
+        self.stop_monitor.clear()
+        self.monitor_thread = threading.Thread(target=self.monitor_task, name="plc-monitor")
         self.monitor_thread.daemon = True
         self.monitor_thread.start()
         self.logger.info("PLC 连接健康监控线程已启动")
@@ -219,7 +477,7 @@ class PLCClient:
 
     def stop_monitor_thread(self):
         """停止监控线程（无修改）"""
-        self.stop_monitor = True
+        self.stop_monitor.set()
         if self.monitor_thread and self.monitor_thread.is_alive():
             self.monitor_thread.join(timeout=5)
         self.logger.info("PLC 连接监控已停止")
@@ -231,11 +489,14 @@ class PLCClient:
                 写给 PLC的通讯心跳
                 原则上一个PLC只需要一个链接去写，即只有一个链接的 self.heart 开关是打开的
         """
+        self._pin_current_thread()
         self.logger.info("启动 PLC心跳 任务")
         try:
-            while not self.stop_heart:
+            while not self.stop_heart.is_set():
                 try:
-                    time.sleep(self.check_interval)
+                    # 等待下一个心跳周期，停止时立即退出
+                    if self.stop_heart.wait(self.check_interval):
+                        break
                     if not (self.connected and self.client):
                         self.logger.warning(f"链接异常，跳过心跳执行读写！")
                     if self.writeDB_NegateBit(self.db_number, self.byte_offset, self.bit_index):
@@ -252,96 +513,191 @@ class PLCClient:
         if self.heart_thread and self.heart_thread.is_alive():
             self.logger.warning("PLC 心跳任务已在运行")
             return
-        self.stop_heart = False
-        self.heart_thread = threading.Thread(target=self.heart_task)
+        self.stop_heart.clear()
+        self.heart_thread = threading.Thread(target=self.heart_task, name="plc-heart")
         self.heart_thread.daemon = True
         self.heart_thread.start()
         self.logger.info("PLC 心跳任务已启动")
 
     def stop_heart_thread(self):
         """停止监控线程（无修改）"""
-        self.stop_heart = True
+        self.stop_heart.set()
         if self.heart_thread and self.heart_thread.is_alive():
             self.heart_thread.join(timeout=5)
         self.logger.info("PLC 心跳任务已停止")
 
 
 
-    def __del__(self):
-        """析构函数（无修改）"""
+    def close(self):
+        """停止监控/心跳/I/O工作线程并断开 PLC 连接"""
         self.stop_monitor_thread()
         self.stop_heart_thread()
+        self.stop_io_worker()
         self.disconnect()
 
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+        return False
+
+    # -------------------------- 单值读取的I/O工作线程（合并并发读取） --------------------------
+    def start_io_worker(self):
+        """启动I/O工作线程"""
+        if self._io_thread and self._io_thread.is_alive():
+            return
+        self._io_thread = threading.Thread(target=self._io_worker, name="plc-io-worker", daemon=True)
+        self._io_thread.start()
+
+    def stop_io_worker(self):
+        """停止I/O工作线程（处理完已排队的请求后退出）"""
+        if self._io_thread and self._io_thread.is_alive():
+            self._req_q.put(None)
+            self._io_thread.join(timeout=5)
+
+    def _io_worker(self):
+        """
+        I/O工作线程：取出一个读取请求后，顺带取出此刻已排队的其它读取请求，
+        多个请求合并为一次多变量读取，单个请求直接 db_read
+        """
+        while True:
+            request = self._req_q.get()
+            if request is None:
+                break
+            batch = [request]
+            stop = False
+            while len(batch) < self.MULTI_VARS_MAX:
+                try:
+                    request = self._req_q.get_nowait()
+                except queue.Empty:
+                    break
+                if request is None:
+                    stop = True
+                    break
+                batch.append(request)
+            self._execute_reads(batch)
+            if stop:
+                break
+
+    def _execute_reads(self, batch: list):
+        """执行一批读取请求并设置各自的 Future 结果"""
+        try:
+            with self.client_lock:
+                if len(batch) == 1:
+                    (db_num, byte_offset, data_type, size, bit_index), future = batch[0]
+                    data = self.client.db_read(db_num, byte_offset, self._multi_item_amount(data_type, size))
+                    if data_type == "bool":
+                        future.set_result(bool(data[0] & _BIT_MASKS[bit_index]))
+                    else:
+                        future.set_result(self._decode_multi_value(data, data_type))
+                    return
+                values = self._read_multi_unlocked([item for item, _ in batch])
+            for (item, future), value in zip(batch, values):
+                if value is None:
+                    future.set_exception(RuntimeError(f"多变量读取DB{item[0]}.{item[1]}失败"))
+                else:
+                    future.set_result(value)
+        except Exception as e:
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+
+    def _read_scalar(self, db_num: int, byte_offset: int, data_type: str, size: int, bit_index=None):
+        """提交一个单值读取请求到I/O工作线程并等待结果（read_cache_ttl 内的相同读取直接返回缓存），失败时抛出异常"""
+        key = (db_num, byte_offset, data_type, size, bit_index)
+        ttl = self.read_cache_ttl
+        if ttl > 0:
+            entry = self._read_cache.get(key)
+            if entry is not None and time.monotonic() - entry[1] < ttl:
+                return entry[0]
+        generation = self._read_cache_gen
+        future = Future()
+        self._req_q.put((key, future))
+        value = future.result(timeout=self.connect_timeout)
+        if ttl > 0 and generation == self._read_cache_gen:
+            self._read_cache[key] = (value, time.monotonic())
+        return value
+
+    def _invalidate_read_cache(self, db_num: Optional[int] = None, byte_offset: int = 0, length: int = 0):
+        """
+        写入后使读取缓存失效，保证之后的读取拿到新值：只删除与写入区域 DB{db_num}.[byte_offset, byte_offset+length) 重叠的缓存项，
+        db_num 为 None 时清空全部缓存
+        """
+        self._read_cache_gen += 1
+        cache = self._read_cache
+        if db_num is None:
+            cache.clear()
+            return
+        write_end = byte_offset + length
+        # 遍历键的快照：调用方线程在 _read_scalar 中不加锁地写入缓存，直接遍历字典可能因大小变化抛出 RuntimeError
+        for key in [key for key in list(cache)
+                    if key[0] == db_num and key[1] < write_end
+                    and byte_offset < key[1] + self._multi_item_amount(key[2], key[3])]:
+            cache.pop(key, None)
+
     # -------------------------- 关键优化5：等待连接就绪（提升可用性） --------------------------
     def wait_for_connection(self, timeout=2):
-        """等待 PLC 连接就绪（避免未连接时直接抛错）"""
-        start_time = time.time()
-        while True:
-            # 超时判断
-            if timeout and (time.time() - start_time) > timeout:
-                self.logger.error(f"等待 PLC 连接超时（{timeout} 秒）")
-                return False
-            # 连接就绪则返回
-            if self.connected and self.client:
-                return True
-            # 未就绪则等待
-            self.logger.warning("等待 PLC 连接就绪...")
-            time.sleep(1)
+        """等待 PLC 连接就绪（避免未连接时直接抛错）；已连接时立即返回，断线时由重连成功唤醒"""
+        if self._connected_event.wait(timeout):
+            return True
+        self.logger.error(f"等待 PLC 连接超时（{timeout} 秒）")
+        return False
 
 
     # ------------------------   boolen （加锁+bug修复） ------------------------
     def readDB_Bit(self, db_num: int, byte_offset: int, bit_offset: int):
-        start_time = time.perf_counter()
+        start_time = time.monotonic() if PLCClient.TIMING_ENABLED else None
         # 等待连接就绪（超时 5 秒）
         if not self.wait_for_connection(timeout=self.connect_timeout):
             self.logger.error(f"读取DB{db_num}.DBX{byte_offset}.{bit_offset}失败：PLC 未连接")
             return False, None
 
-        # 获取锁，超时则返回失败
-        if not self.client_lock.acquire(timeout=self.lock_timeout):
-            self.logger.error(f"读取DB{db_num}.DBX{byte_offset}.{bit_offset}失败：获取锁超时")
-            return False, None
-
         try:
-            buffer = self.client.db_read(db_num, byte_offset, 1)
-            value = util.get_bool(buffer, 0, bit_offset)
-            self.logger.debug(f"成功读取DB{db_num}.DBX{byte_offset}.{bit_offset}值: {value}")
+            value = self._read_scalar(db_num, byte_offset, "bool", 1, bit_offset)
+            if self.logger.isEnabledFor(logging.DEBUG):
+                self.logger.debug("成功读取DB%s.DBX%s.%s值: %s", db_num, byte_offset, bit_offset, value)
             return True, value
         except Exception as e:
             self.logger.error(f"读取DB{db_num}.DBX{byte_offset}.{bit_offset}值时出现异常错误: {e}")
             return False, None
         finally:
-            self.client_lock.release()
             # 记录执行时间
-            elapsed = time.perf_counter() - start_time
-            self._log_execution_time("readDB_Bit", elapsed)
+            if start_time is not None:
+                self._log_execution_time("readDB_Bit", time.monotonic() - start_time)
 
 
-    def writeDB_Bit(self, db_num: int, byte_offset: int, bit_offset: int, value: bool):
-        start_time = time.perf_counter()
+    def writeDB_Bit(self, db_num: int, byte_offset: int, bit_offset: int, value: bool, preserve_byte: bool = True):
+        """
+        写入bool位
+            preserve_byte=True：读-改-写，保留同字节内其它位（默认）
+            preserve_byte=False：该字节整体由调用方独占，不再预读，其它位写0
+        """
+        start_time = time.monotonic() if PLCClient.TIMING_ENABLED else None
         if not self.wait_for_connection(timeout=self.connect_timeout):
             self.logger.error(f"写入DB{db_num}.DBX{byte_offset}.{bit_offset}失败：PLC 未连接")
             return False
 
-        if not self.client_lock.acquire(timeout=self.lock_timeout):
-            self.logger.error(f"写入DB{db_num}.DBX{byte_offset}.{bit_offset}失败：获取锁超时")
-            return False
-
         try:
-            boolData = self.client.db_read(db_num, byte_offset, 1)
-            util.set_bool(boolData, 0, bit_offset, value)
-            self.client.db_write(db_num, byte_offset, boolData)
-            self.logger.debug(f"成功写入DB{db_num}.DBX{byte_offset}.{bit_offset}值: {value}")
-            return True
+            with self.client_lock:
+                if preserve_byte:
+                    boolData = self.client.db_read(db_num, byte_offset, 1)
+                else:
+                    boolData = bytearray(1)
+                mask = _BIT_MASKS[bit_offset]
+                boolData[0] = (boolData[0] | mask) if value else (boolData[0] & ~mask)
+                self.client.db_write(db_num, byte_offset, boolData)
+                self._invalidate_read_cache(db_num, byte_offset, 1)
+                if self.logger.isEnabledFor(logging.DEBUG):
+                    self.logger.debug("成功写入DB%s.DBX%s.%s值: %s", db_num, byte_offset, bit_offset, value)
+                return True
         except Exception as e:
             self.logger.error(f"写入DB{db_num}.DBX{byte_offset}.{bit_offset}值时出现异常错误: {e}")
             return False
         finally:
-            self.client_lock.release()
             # 记录执行时间
-            elapsed = time.perf_counter() - start_time
-            self._log_execution_time("writeDB_Bit", elapsed)
+            if start_time is not None:
+                self._log_execution_time("writeDB_Bit", time.monotonic() - start_time)
 
     # -------------------------- bug修复1：移除多余的 self 参数 --------------------------
     def writeDB_SetBit(self, db_num: int, byte_offset: int, bit_offset: int):
@@ -354,239 +710,213 @@ class PLCClient:
 
 
     def writeDB_NegateBit(self, db_num: int, byte_offset: int, bit_offset: int):
+        start_time = time.monotonic() if PLCClient.TIMING_ENABLED else None
         if not self.wait_for_connection(timeout=self.connect_timeout):
             self.logger.error(f"取反DB{db_num}.DBX{byte_offset}.{bit_offset}失败：PLC 未连接")
             return False
 
         try:
-            # -------------------------- bug修复2：逻辑判断错误 --------------------------
-            res, bitValue = self.readDB_Bit(db_num, byte_offset, bit_offset)
-            # 原代码：if res: raise → 应该是 if not res（读取失败才抛错）
-            if not res:
-                raise Exception("bit位取反时原值读取失败")
-            result = self.writeDB_Bit(db_num, byte_offset, bit_offset, not bitValue)
-            self.logger.debug(f"成功取反DB{db_num}.DBX{byte_offset}.{bit_offset}值")
-            return result
+            with self.client_lock:
+                # 一次加锁内完成 读-取反-写：只读一次字节，且读写之间不会被其它线程改写同字节的其它位
+                boolData = self.client.db_read(db_num, byte_offset, 1)
+                boolData[0] ^= _BIT_MASKS[bit_offset]
+                self.client.db_write(db_num, byte_offset, boolData)
+                self._invalidate_read_cache(db_num, byte_offset, 1)
+                if self.logger.isEnabledFor(logging.DEBUG):
+                    self.logger.debug("成功取反DB%s.DBX%s.%s值", db_num, byte_offset, bit_offset)
+                return True
         except Exception as e:
             self.logger.error(f"取反 DB{db_num}.DBX{byte_offset}.{bit_offset}时出现异常错误: {e}")
             return False
+        finally:
+            # 记录执行时间
+            if start_time is not None:
+                self._log_execution_time("writeDB_NegateBit", time.monotonic() - start_time)
 
     # ------------------------   int （加锁优化） ------------------------
 
     def readDB_Int(self, db_num: int, byte_offset: int):
-        start_time = time.perf_counter()
+        start_time = time.monotonic() if PLCClient.TIMING_ENABLED else None
         if not self.wait_for_connection(timeout=self.connect_timeout):
             self.logger.error(f"读取DB{db_num}.INT{byte_offset}失败：PLC 未连接")
             return False, None
 
-        if not self.client_lock.acquire(timeout=self.lock_timeout):
-            self.logger.error(f"读取DB{db_num}.INT{byte_offset}失败：获取锁超时")
-            return False, None
-
         try:
-            bufferData = self.client.db_read(db_num, byte_offset, 2)
-            value = util.get_int(bufferData, 0)
-            self.logger.debug(f"成功读取DB{db_num}.INT{byte_offset}值: {value}")
+            value = self._read_scalar(db_num, byte_offset, "int", 2)
+            if self.logger.isEnabledFor(logging.DEBUG):
+                self.logger.debug("成功读取DB%s.INT%s值: %s", db_num, byte_offset, value)
             return True, value
         except Exception as e:
             self.logger.error(f"读取DB{db_num}.INT{byte_offset}值时出现异常错误: {e}")
             return False, None
         finally:
-            self.client_lock.release()
             # 记录执行时间
-            elapsed = time.perf_counter() - start_time
-            self._log_execution_time("readDB_Int", elapsed)
+            if start_time is not None:
+                self._log_execution_time("readDB_Int", time.monotonic() - start_time)
 
     def writeDB_Int(self, db_num: int, byte_offset: int, value: int):
-        start_time = time.perf_counter()
+        start_time = time.monotonic() if PLCClient.TIMING_ENABLED else None
         if not self.wait_for_connection(timeout=self.connect_timeout):
             self.logger.error(f"写入DB{db_num}.INT{byte_offset}失败：PLC 未连接")
             return False
 
-        if not self.client_lock.acquire(timeout=self.lock_timeout):
-            self.logger.error(f"写入DB{db_num}.INT{byte_offset}失败：获取锁超时")
-            return False
-
         try:
-            bufferData = bytearray(2)
-            util.set_int(bufferData, 0, value)
-            self.client.db_write(db_num, byte_offset, bufferData)
-            self.logger.debug(f"成功写入DB{db_num}.INT{byte_offset}值: {value}")
-            return True
+            with self.client_lock:
+                bufferData = self._scratch2
+                util.set_int(bufferData, 0, value)
+                self.client.db_write(db_num, byte_offset, bufferData)
+                self._invalidate_read_cache(db_num, byte_offset, len(bufferData))
+                if self.logger.isEnabledFor(logging.DEBUG):
+                    self.logger.debug("成功写入DB%s.INT%s值: %s", db_num, byte_offset, value)
+                return True
         except Exception as e:
             self.logger.error(f"写入DB{db_num}.INT{byte_offset}值{value}时出现异常错误: {e}")
             return False
         finally:
-            self.client_lock.release()
             # 记录执行时间
-            elapsed = time.perf_counter() - start_time
-            self._log_execution_time("writeDB_Int", elapsed)
+            if start_time is not None:
+                self._log_execution_time("writeDB_Int", time.monotonic() - start_time)
 
     # ------------------------   DInt/Real/LReal/String （统一加锁优化） ------------------------
     # 以下方法仅添加“锁机制”和“等待连接就绪”，逻辑与原代码一致，不再重复标注
     def readDB_DInt(self, db_num: int, byte_offset: int):
-        start_time = time.perf_counter()
+        start_time = time.monotonic() if PLCClient.TIMING_ENABLED else None
         if not self.wait_for_connection(timeout=self.connect_timeout):
             self.logger.error(f"读取DB{db_num}.DINT{byte_offset}失败：PLC 未连接")
             return False, None
 
-        if not self.client_lock.acquire(timeout=self.lock_timeout):
-            self.logger.error(f"读取DB{db_num}.DINT{byte_offset}失败：获取锁超时")
-            return False, None
-
         try:
-            bufferData = self.client.db_read(db_num, byte_offset, 4)
-            value = util.get_dint(bufferData, 0)
-            self.logger.debug(f"成功读取DB{db_num}.DINT{byte_offset}值: {value}")
+            value = self._read_scalar(db_num, byte_offset, "dint", 4)
+            if self.logger.isEnabledFor(logging.DEBUG):
+                self.logger.debug("成功读取DB%s.DINT%s值: %s", db_num, byte_offset, value)
             return True, value
         except Exception as e:
             self.logger.error(f"读取DB{db_num}.DINT{byte_offset}值时出现异常错误: {e}")
             return False, None
         finally:
-            self.client_lock.release()
             # 记录执行时间
-            elapsed = time.perf_counter() - start_time
-            self._log_execution_time("readDB_DInt", elapsed)
+            if start_time is not None:
+                self._log_execution_time("readDB_DInt", time.monotonic() - start_time)
 
 
     def writeDB_DInt(self, db_num: int, byte_offset: int, value: int):
-        start_time = time.perf_counter()
+        start_time = time.monotonic() if PLCClient.TIMING_ENABLED else None
         if not self.wait_for_connection(timeout=self.connect_timeout):
             self.logger.error(f"写入DB{db_num}.DINT{byte_offset}失败：PLC 未连接")
             return False
 
-        if not self.client_lock.acquire(timeout=self.lock_timeout):
-            self.logger.error(f"写入DB{db_num}.DINT{byte_offset}失败：获取锁超时")
-            return False
-
         try:
-            bufferData = bytearray(4)
-            util.set_dint(bufferData, 0, value)
-            self.client.db_write(db_num, byte_offset, bufferData)
-            self.logger.debug(f"成功写入DB{db_num}.DINT{byte_offset}值: {value}")
-            return True
+            with self.client_lock:
+                bufferData = self._scratch4
+                util.set_dint(bufferData, 0, value)
+                self.client.db_write(db_num, byte_offset, bufferData)
+                self._invalidate_read_cache(db_num, byte_offset, len(bufferData))
+                if self.logger.isEnabledFor(logging.DEBUG):
+                    self.logger.debug("成功写入DB%s.DINT%s值: %s", db_num, byte_offset, value)
+                return True
         except Exception as e:
             self.logger.error(f"写入DB{db_num}.DINT{byte_offset}值时出现异常错误: {e}")
             return False
         finally:
-            self.client_lock.release()
             # 记录执行时间
-            elapsed = time.perf_counter() - start_time
-            self._log_execution_time("writeDB_DInt", elapsed)
+            if start_time is not None:
+                self._log_execution_time("writeDB_DInt", time.monotonic() - start_time)
 
 
     def readDB_Real(self, db_num: int, byte_offset: int):
-        start_time = time.perf_counter()
+        start_time = time.monotonic() if PLCClient.TIMING_ENABLED else None
         if not self.wait_for_connection(timeout=self.connect_timeout):
             self.logger.error(f"读取DB{db_num}.REAL{byte_offset}失败：PLC 未连接")
             return False, None
 
-        if not self.client_lock.acquire(timeout=self.lock_timeout):
-            self.logger.error(f"读取DB{db_num}.REAL{byte_offset}失败：获取锁超时")
-            return False, None
-
         try:
-            bufferData = self.client.db_read(db_num, byte_offset, 4)
-            value = util.get_real(bufferData, 0)
-            self.logger.debug(f"成功读取DB{db_num}.REAL{byte_offset}值: {value}")
+            value = self._read_scalar(db_num, byte_offset, "real", 4)
+            if self.logger.isEnabledFor(logging.DEBUG):
+                self.logger.debug("成功读取DB%s.REAL%s值: %s", db_num, byte_offset, value)
             return True, value
         except Exception as e:
             self.logger.error(f"读取DB{db_num}.REAL{byte_offset}值时出现异常错误: {e}")
             return False, None
         finally:
-            self.client_lock.release()
             # 记录执行时间
-            elapsed = time.perf_counter() - start_time
-            self._log_execution_time("readDB_Real", elapsed)
+            if start_time is not None:
+                self._log_execution_time("readDB_Real", time.monotonic() - start_time)
 
 
     def writeDB_Real(self, db_num: int, byte_offset: int, value: float):
-        start_time = time.perf_counter()
+        start_time = time.monotonic() if PLCClient.TIMING_ENABLED else None
         if not self.wait_for_connection(timeout=self.connect_timeout):
             self.logger.error(f"写入DB{db_num}.REAL{byte_offset}失败：PLC 未连接")
             return False
 
-        if not self.client_lock.acquire(timeout=self.lock_timeout):
-            self.logger.error(f"写入DB{db_num}.REAL{byte_offset}失败：获取锁超时")
-            return False
-
         try:
-            bufferData = bytearray(4)
-            util.set_real(bufferData, 0, value)
-            self.client.db_write(db_num, byte_offset, bufferData)
-            self.logger.debug(f"成功写入DB{db_num}.REAL{byte_offset}值: {value}")
-            return True
+            with self.client_lock:
+                bufferData = self._scratch4
+                util.set_real(bufferData, 0, value)
+                self.client.db_write(db_num, byte_offset, bufferData)
+                self._invalidate_read_cache(db_num, byte_offset, len(bufferData))
+                if self.logger.isEnabledFor(logging.DEBUG):
+                    self.logger.debug("成功写入DB%s.REAL%s值: %s", db_num, byte_offset, value)
+                return True
         except Exception as e:
             self.logger.error(f"写入DB{db_num}.REAL{byte_offset}值时出现异常错误: {e}")
             return False
         finally:
-            self.client_lock.release()
             # 记录执行时间
-            elapsed = time.perf_counter() - start_time
-            self._log_execution_time("writeDB_Real", elapsed)
+            if start_time is not None:
+                self._log_execution_time("writeDB_Real", time.monotonic() - start_time)
 
 
     def readDB_LReal(self, db_num: int, byte_offset: int):
-        start_time = time.perf_counter()
+        start_time = time.monotonic() if PLCClient.TIMING_ENABLED else None
         if not self.wait_for_connection(timeout=self.connect_timeout):
             self.logger.error(f"读取DB{db_num}.LREAL{byte_offset}失败：PLC 未连接")
             return False, None
 
-        if not self.client_lock.acquire(timeout=self.lock_timeout):
-            self.logger.error(f"读取DB{db_num}.LREAL{byte_offset}失败：获取锁超时")
-            return False, None
-
         try:
-            bufferData = self.client.db_read(db_num, byte_offset, 8)
-            value = util.get_lreal(bufferData, 0)
-            self.logger.debug(f"成功读取DB{db_num}.LREAL{byte_offset}值: {value}")
+            value = self._read_scalar(db_num, byte_offset, "lreal", 8)
+            if self.logger.isEnabledFor(logging.DEBUG):
+                self.logger.debug("成功读取DB%s.LREAL%s值: %s", db_num, byte_offset, value)
             return True, value
         except Exception as e:
             self.logger.error(f"读取DB{db_num}.LREAL{byte_offset}值时出现异常错误: {e}")
             return False, None
         finally:
-            self.client_lock.release()
             # 记录执行时间
-            elapsed = time.perf_counter() - start_time
-            self._log_execution_time("readDB_LReal", elapsed)
+            if start_time is not None:
+                self._log_execution_time("readDB_LReal", time.monotonic() - start_time)
 
 
     def writeDB_LReal(self, db_num: int, byte_offset: int, value: float):
-        start_time = time.perf_counter()
+        start_time = time.monotonic() if PLCClient.TIMING_ENABLED else None
         if not self.wait_for_connection(timeout=self.connect_timeout):
             self.logger.error(f"写入DB{db_num}.LREAL{byte_offset}失败：PLC 未连接")
             return False
 
-        if not self.client_lock.acquire(timeout=self.lock_timeout):
-            self.logger.error(f"写入DB{db_num}.LREAL{byte_offset}失败：获取锁超时")
-            return False
-
         try:
-            bufferData = bytearray(8)
-            util.set_lreal(bufferData, 0, value)
-            self.client.db_write(db_num, byte_offset, bufferData)
-            self.logger.debug(f"成功写入DB{db_num}.LREAL{byte_offset}值: {value}")
-            return True
+            with self.client_lock:
+                bufferData = self._scratch8
+                util.set_lreal(bufferData, 0, value)
+                self.client.db_write(db_num, byte_offset, bufferData)
+                self._invalidate_read_cache(db_num, byte_offset, len(bufferData))
+                if self.logger.isEnabledFor(logging.DEBUG):
+                    self.logger.debug("成功写入DB%s.LREAL%s值: %s", db_num, byte_offset, value)
+                return True
         except Exception as e:
             self.logger.error(f"写入DB{db_num}.LREAL{byte_offset}值时出现异常错误: {e}")
             return False
         finally:
-            self.client_lock.release()
             # 记录执行时间
-            elapsed = time.perf_counter() - start_time
-            self._log_execution_time("writeDB_LReal", elapsed)
+            if start_time is not None:
+                self._log_execution_time("writeDB_LReal", time.monotonic() - start_time)
 
 
     def readDB_String(self, db_num: int, byte_offset: int, size: int, encoding='gbk'):
-        start_time = time.perf_counter()
+        start_time = time.monotonic() if PLCClient.TIMING_ENABLED else None
         if not self.wait_for_connection(timeout=self.connect_timeout):
             self.logger.error(f"读取DB{db_num}.String{byte_offset}.{size}失败：PLC 未连接")
             return False, None
 
-        if not self.client_lock.acquire(timeout=self.lock_timeout):
-            self.logger.error(f"读取DB{db_num}.String{byte_offset}.{size}失败：获取锁超时")
-            return False, None
-
         """
                 读取字符串，支持中文
 
@@ -600,54 +930,59 @@ class PLCClient:
                     (成功状态, 字符串内容) 或 (失败状态, None)
                 """
         try:
-            # 读取字符串数据（包括2字节的头部）
-            buffer = self.client.db_read(db_num, byte_offset, size + 2 )
+            with self.client_lock:
+                # 读取字符串数据（包括2字节的头部）
+                buffer = self.client.db_read(db_num, byte_offset, size + 2 )
 
-            # 获取实际字符串长度（第二个字节）
-            actual_length = buffer[1]
+                # 获取实际字符串长度（第二个字节）
+                actual_length = buffer[1]
 
-            # 提取字符串数据（从第2字节开始，取实际长度）
-            string_bytes = buffer[2:2 + actual_length]
+                # 提取字符串数据（从第2字节开始，取实际长度）
+                string_bytes = buffer[2:2 + actual_length]
 
-            # 解码字符串
-            try:
-                # 尝试使用指定编码解码
-                string_value = string_bytes.decode(encoding)
-                self.logger.debug(f"成功读取DB{db_num}.String{byte_offset}.{size}值: {string_value}")
-                return True, string_value
-            except UnicodeDecodeError:
-                """
-                如果编码失败，尝试去掉末尾一个字节重新编码，解决 尾部半个中文字符的问题
-                """
+                # 纯ASCII内容直接按ASCII解码，不走编码表查找也不会触发解码异常
+                if string_bytes.isascii():
+                    string_value = string_bytes.decode('ascii')
+                    if self.logger.isEnabledFor(logging.DEBUG):
+                        self.logger.debug("成功读取DB%s.String%s.%s值: %s", db_num, byte_offset, size, string_value)
+                    return True, string_value
+
+                # 解码字符串
                 try:
-                    string_value = string_bytes[:-1].decode(encoding)
-                    self.logger.debug(f"成功读取DB{db_num}.String{byte_offset}.{size}值: {string_value}")
+                    # 尝试使用指定编码解码
+                    string_value = string_bytes.decode(encoding)
+                    if self.logger.isEnabledFor(logging.DEBUG):
+                        self.logger.debug("成功读取DB%s.String%s.%s值: %s", db_num, byte_offset, size, string_value)
                     return True, string_value
-                except UnicodeDecodeError as e:
-                    self.logger.error(f"无法解码字符串: {e}")
-                    return False, None
+                except UnicodeDecodeError:
+                    """
+                    如果编码失败，尝试去掉末尾一个字节重新编码，解决 尾部半个中文字符的问题
+                    """
+                    try:
+                        string_value = string_bytes[:-1].decode(encoding)
+                        if self.logger.isEnabledFor(logging.DEBUG):
+                            self.logger.debug("成功读取DB%s.String%s.%s值: %s", db_num, byte_offset, size, string_value)
+                        return True, string_value
+                    except UnicodeDecodeError as e:
+                        self.logger.error(f"无法解码字符串: {e}")
+                        return False, None
 
         except Exception as e:
             self.logger.error(f"读取DB{db_num}.String{byte_offset}.{size}值时出现异常错误: {e}")
             return False, None
 
         finally:
-            self.client_lock.release()
             # 记录执行时间
-            elapsed = time.perf_counter() - start_time
-            self._log_execution_time("readDB_String", elapsed)
+            if start_time is not None:
+                self._log_execution_time("readDB_String", time.monotonic() - start_time)
 
 
     def writeDB_String(self, db_num: int, byte_offset: int, size: int, string_value: str):
-        start_time = time.perf_counter()
+        start_time = time.monotonic() if PLCClient.TIMING_ENABLED else None
         if not self.wait_for_connection(timeout=self.connect_timeout):
             self.logger.error(f"写入DB{db_num}.String{byte_offset}.{size}失败：PLC 未连接")
             return False
 
-        if not self.client_lock.acquire(timeout=self.lock_timeout):
-            self.logger.error(f"写入DB{db_num}.String{byte_offset}.{size}失败：获取锁超时")
-            return False
-
         """
                向PLC写入字符串（支持中文）
 
@@ -662,109 +997,393 @@ class PLCClient:
                    (成功状态, 错误信息)
                """
         try:
-            encoding = 'gbk'
-            # 将字符串编码为字节
-            try:
-                string_bytes = string_value.encode(encoding)
-            except UnicodeEncodeError as e:
-                self.logger.error(f"写入字符串{string_value}时编码出错: {e}")
-                return False
-
-            # 检查长度是否超出限制
-            max_content_length = size
-            if len(string_bytes) > max_content_length :
-                # 截断字符串
-                truncated_bytes = string_bytes[:max_content_length]
-                try:
-                    # 尝试解码截断后的字节，确保不会在字符中间截断
-                    truncated_str = truncated_bytes.decode(encoding)
-                    string_bytes = truncated_str.encode(encoding)
-                    self.logger.warning(f"字符串长度超出限制，已截断为: {truncated_str}")
-                except:
-                    # 如果解码失败，可能出现窃取半个中文字符的问题，尝试去掉末尾字符重试
-                    truncated_str = truncated_bytes[:-1].decode(encoding)
-                    string_bytes = truncated_str.encode(encoding)
-                    self.logger.warning(f"字符串长度超出限制，已截断为: {truncated_str}")
-
-            # 创建PLC字符串格式
-            # 西门子字符串格式:
-            # 第一个字节: 最大长度 (max_length)
-            # 第二个字节: 实际长度 (actual_length)
-            # 接着是字符串数据，剩余部分填充0
-            buffer = bytearray(size+2)
-            buffer[0] = size  # 最大长度
-            buffer[1] = len(string_bytes)  # 实际长度
-
-            # 复制字符串数据
-            buffer[2:2 + len(string_bytes)] = string_bytes
-
-            # 剩余部分填充0（可选，但建议填充以确保一致性）
-            for i in range(2 + len(string_bytes), size+2):
-                buffer[i] = 0
-
-            # 写入PLC
-            self.client.db_write(db_num, byte_offset, buffer)
-            self.logger.debug(f"成功写入字符串到DB{db_num}.{byte_offset}.{size}: {string_value} (编码: {encoding})")
-            return True
+            with self.client_lock:
+                encoding = 'gbk'
+                max_content_length = size
+                if string_value.isascii():
+                    # 纯ASCII快速路径：单字节编码，截断不会切开字符，无需解码重试
+                    string_bytes = string_value.encode('ascii')
+                    if len(string_bytes) > max_content_length:
+                        string_bytes = string_bytes[:max_content_length]
+                        self.logger.warning(f"字符串长度超出限制，已截断为: {string_bytes.decode('ascii')}")
+                else:
+                    # 将字符串编码为字节
+                    try:
+                        string_bytes = string_value.encode(encoding)
+                    except UnicodeEncodeError as e:
+                        self.logger.error(f"写入字符串{string_value}时编码出错: {e}")
+                        return False
+
+                # 检查长度是否超出限制
+                if len(string_bytes) > max_content_length :
+                    # 截断字符串
+                    truncated_bytes = string_bytes[:max_content_length]
+                    try:
+                        # 尝试解码截断后的字节，确保不会在字符中间截断
+                        truncated_str = truncated_bytes.decode(encoding)
+                        string_bytes = truncated_str.encode(encoding)
+                        self.logger.warning(f"字符串长度超出限制，已截断为: {truncated_str}")
+                    except:
+                        # 如果解码失败，可能出现窃取半个中文字符的问题，尝试去掉末尾字符重试
+                        truncated_str = truncated_bytes[:-1].decode(encoding)
+                        string_bytes = truncated_str.encode(encoding)
+                        self.logger.warning(f"字符串长度超出限制，已截断为: {truncated_str}")
+
+                # 创建PLC字符串格式
+                # 西门子字符串格式:
+                # 第一个字节: 最大长度 (max_length)
+                # 第二个字节: 实际长度 (actual_length)
+                # 接着是字符串数据，剩余部分填充0
+                buffer = bytearray(size+2)
+                buffer[0] = size  # 最大长度
+                buffer[1] = len(string_bytes)  # 实际长度
+
+                # 复制字符串数据（bytearray 新建时已全部为0，剩余部分无需再填充）
+                buffer[2:2 + len(string_bytes)] = string_bytes
+
+                # 写入PLC
+                self.client.db_write(db_num, byte_offset, buffer)
+                self._invalidate_read_cache(db_num, byte_offset, len(buffer))
+                if self.logger.isEnabledFor(logging.DEBUG):
+                    self.logger.debug("成功写入字符串到DB%s.%s.%s: %s (编码: %s)", db_num, byte_offset, size, string_value, encoding)
+                return True
 
         except Exception as e:
             self.logger.error(f"写入DB{db_num}.String{byte_offset}.{size}值时出现异常错误: {e}")
             return False
         finally:
-            self.client_lock.release()
             # 记录执行时间
-            elapsed = time.perf_counter() - start_time
-            self._log_execution_time("writeDB_String", elapsed)
+            if start_time is not None:
+                self._log_execution_time("writeDB_String", time.monotonic() - start_time)
 
 
  # ------------------------   批量读取字节码 （加锁优化） ------------------------
     def readDB_Byte(self, db_num: int, byte_offset: int, size: int):
-        start_time = time.perf_counter()
+        start_time = time.monotonic() if PLCClient.TIMING_ENABLED else None
         if not self.wait_for_connection(timeout=self.connect_timeout):
             self.logger.error(f"读取DB{db_num}.Byte{byte_offset}.{size}失败：PLC 未连接")
             return False, None
 
-        if not self.client_lock.acquire(timeout=self.lock_timeout):
-            self.logger.error(f"读取DB{db_num}.Byte{byte_offset}.{size}失败：获取锁超时")
-            return False, None
-
         try:
-            bufferData = self.client.db_read(db_num, byte_offset, size)
-            value = bufferData
-            self.logger.debug(f"成功读取DB{db_num}.Byte{byte_offset}.{size}值: {value}")
-            return True, value
+            with self.client_lock:
+                bufferData = self.client.db_read(db_num, byte_offset, size)
+                value = bufferData
+                if self.logger.isEnabledFor(logging.DEBUG):
+                    self.logger.debug("成功读取DB%s.Byte%s.%s值: %s", db_num, byte_offset, size, value)
+                return True, value
         except Exception as e:
             self.logger.error(f"读取DB{db_num}.Byte{byte_offset}.{size}值时出现异常错误: {e}")
             return False, None
         finally:
-            self.client_lock.release()
             # 记录执行时间
-            elapsed = time.perf_counter() - start_time
-            self._log_execution_time("readDB_Byte", elapsed)
+            if start_time is not None:
+                self._log_execution_time("readDB_Byte", time.monotonic() - start_time)
 
     # ------------------------   批量写入字节码 （加锁优化） ------------------------
     def writeDB_Byte(self, db_num: int, byte_offset: int, write_data: bytearray):
-        start_time = time.perf_counter()
+        start_time = time.monotonic() if PLCClient.TIMING_ENABLED else None
         if not self.wait_for_connection(timeout=self.connect_timeout):
             self.logger.error(f"写入DB{db_num}.Byte{byte_offset}.{len(write_data)}失败：PLC 未连接")
             return False, None
 
-        if not self.client_lock.acquire(timeout=self.lock_timeout):
-            self.logger.error(f"写入DB{db_num}.Byte{byte_offset}.{len(write_data)}失败：获取锁超时")
+        try:
+            with self.client_lock:
+                result = self.client.db_write(db_num, byte_offset, write_data)
+                self._invalidate_read_cache(db_num, byte_offset, len(write_data))
+                if self.logger.isEnabledFor(logging.DEBUG):
+                    self.logger.debug("成功写入DB%s.Byte%s.%s写入结果代码: %s", db_num, byte_offset, len(write_data), result)
+                return True
+        except Exception as e:
+            self.logger.error(f"写入DB{db_num}.Byte{byte_offset}.{len(write_data)}值时出现异常错误: {e}")
             return False, None
+        finally:
+            # 记录执行时间
+            if start_time is not None:
+                self._log_execution_time("writeDB_Byte", time.monotonic() - start_time)
+
 
+    # ------------------------   连续数组读取 （一次读取 + 整体解析） ------------------------
+    def _readDB_Array(self, db_num: int, byte_offset: int, count: int, type_code: str, item_size: int):
+        """读取 count 个连续的同类型数值，整段一次 struct 解析（大端），返回 (成功状态, 数值元组)"""
+        ok, buffer = self.readDB_Byte(db_num, byte_offset, count * item_size)
+        if not ok:
+            return False, None
         try:
-            result = self.client.db_write(db_num, byte_offset, write_data)
-            self.logger.debug(f"成功写入DB{db_num}.Byte{byte_offset}.{len(write_data)}写入结果代码: {result}")
-            return True
+            return True, struct.unpack(f">{count}{type_code}", buffer)
+        except struct.error as e:
+            self.logger.error(f"解析DB{db_num}.{byte_offset}数组({count}个)失败: {e}")
+            return False, None
+
+    def readDB_IntArray(self, db_num: int, byte_offset: int, count: int):
+        return self._readDB_Array(db_num, byte_offset, count, "h", 2)
+
+    def readDB_DIntArray(self, db_num: int, byte_offset: int, count: int):
+        return self._readDB_Array(db_num, byte_offset, count, "i", 4)
+
+    def readDB_RealArray(self, db_num: int, byte_offset: int, count: int):
+        return self._readDB_Array(db_num, byte_offset, count, "f", 4)
+
+    def readDB_LRealArray(self, db_num: int, byte_offset: int, count: int):
+        return self._readDB_Array(db_num, byte_offset, count, "d", 8)
+
+    # ------------------------   变量组轮询 （按地址连续段读取） ------------------------
+    def poll_group(self, group: TagGroup):
+        """
+        轮询一个变量组：每个地址连续段一次 db_read，结果写入 group 的复用缓冲区
+        返回:
+            (成功状态, 缓冲区 memoryview)，各变量值通过 group.get(i) / group.get_int(i) 等解析
+        """
+        start_time = time.monotonic() if PLCClient.TIMING_ENABLED else None
+        if not self.wait_for_connection(timeout=self.connect_timeout):
+            self.logger.error(f"轮询变量组({len(group)}个变量)失败：PLC 未连接")
+            return False, None
+
+        try:
+            buffer = group.buffer
+            with self.client_lock:
+                for db_num, start, size, position in group.runs:
+                    buffer[position:position + size] = self.client.db_read(db_num, start, size)
+            if self.logger.isEnabledFor(logging.DEBUG):
+                self.logger.debug("成功轮询变量组: %s个变量, %s个读取段", len(group), len(group.runs))
+            return True, group.view
         except Exception as e:
-            self.logger.error(f"写入DB{db_num}.Byte{byte_offset}.{len(write_data)}值时出现异常错误: {e}")
+            self.logger.error(f"轮询变量组({len(group)}个变量)时出现异常错误: {e}")
             return False, None
         finally:
-            self.client_lock.release()
             # 记录执行时间
-            elapsed = time.perf_counter() - start_time
-            self._log_execution_time("writeDB_Byte", elapsed)
+            if start_time is not None:
+                self._log_execution_time("poll_group", time.monotonic() - start_time)
+
+    # ------------------------   多变量批量读写 （一次请求打包多个变量） ------------------------
+    # 单次多变量请求的变量数上限（S7协议限制）
+    MULTI_VARS_MAX = 20
+    # 多变量请求/响应报文中与变量数据无关的固定开销（字节）
+    MULTI_HEADER_SIZE = 19
+    # 每个变量在请求报文中的地址描述长度 / 在响应报文中的数据头长度（字节）
+    MULTI_ITEM_REQ_SIZE = 12
+    MULTI_ITEM_RESP_SIZE = 4
+
+    @staticmethod
+    def _multi_item_amount(data_type: str, size: int) -> int:
+        """变量在PLC中占用的字节数（bool按位访问，占1个单位）"""
+        if data_type == "string":
+            return size + 2
+        return {"bool": 1, "int": 2, "dint": 4, "real": 4, "lreal": 8}.get(data_type, size)
+
+    def _split_multi_batches(self, amounts: list) -> list:
+        """按变量数上限和PDU大小把变量划分为若干批，返回 [[下标, ...], ...]"""
+        budget = self.pdu_size - self.MULTI_HEADER_SIZE
+        batches = []
+        batch, used = [], 0
+        for index, amount in enumerate(amounts):
+            # 响应数据按偶数字节对齐
+            cost = max(self.MULTI_ITEM_RESP_SIZE + amount + (amount & 1), self.MULTI_ITEM_REQ_SIZE)
+            if batch and (len(batch) >= self.MULTI_VARS_MAX or used + cost > budget):
+                batches.append(batch)
+                batch, used = [], 0
+            batch.append(index)
+            used += cost
+        if batch:
+            batches.append(batch)
+        return batches
+
+    @staticmethod
+    def _make_multi_item(db_num: int, byte_offset: int, data_type: str, amount: int, bit_index=None):
+        """构造一个S7DataItem，返回 (item, 数据缓冲区)，缓冲区需在请求完成前保持引用"""
+        item = S7DataItem()
+        item.Area = Area.DB
+        item.DBNumber = db_num
+        if data_type == "bool":
+            # bool 按位读写，不影响同字节内的其它位
+            item.WordLen = WordLen.Bit
+            item.Start = byte_offset * 8 + (bit_index or 0)
+            item.Amount = 1
+        else:
+            item.WordLen = WordLen.Byte
+            item.Start = byte_offset
+            item.Amount = amount
+        buffer = (ctypes.c_uint8 * amount)()
+        item.pData = ctypes.cast(buffer, ctypes.POINTER(ctypes.c_uint8))
+        return item, buffer
+
+    def _decode_multi_value(self, data: bytearray, data_type: str, encoding='gbk'):
+        """把读取到的字节解析为对应类型的值"""
+        if data_type == "bool":
+            return bool(data[0])
+        if data_type == "int":
+            return util.get_int(data, 0)
+        if data_type == "dint":
+            return util.get_dint(data, 0)
+        if data_type == "real":
+            return util.get_real(data, 0)
+        if data_type == "lreal":
+            return util.get_lreal(data, 0)
+        if data_type == "string":
+            string_bytes = data[2:2 + data[1]]
+            try:
+                return string_bytes.decode(encoding)
+            except UnicodeDecodeError:
+                # 尾部半个中文字符的问题，去掉末尾一个字节重新解码
+                return string_bytes[:-1].decode(encoding)
+        return data
+
+    def _encode_multi_value(self, buffer, data_type: str, size: int, value, encoding='gbk'):
+        """把待写入的值按类型编码到缓冲区"""
+        if data_type == "bool":
+            buffer[0] = 1 if value else 0
+        elif data_type in ("int", "dint", "real", "lreal"):
+            data = bytearray(len(buffer))
+            if data_type == "int":
+                util.set_int(data, 0, value)
+            elif data_type == "dint":
+                util.set_dint(data, 0, value)
+            elif data_type == "real":
+                util.set_real(data, 0, value)
+            else:
+                util.set_lreal(data, 0, value)
+            ctypes.memmove(buffer, bytes(data), len(data))
+        elif data_type == "string":
+            string_bytes = str(value).encode(encoding)
+            if len(string_bytes) > size:
+                # 截断时避免留下半个中文字符
+                string_bytes = string_bytes[:size].decode(encoding, errors='ignore').encode(encoding)
+            buffer[0] = size
+            buffer[1] = len(string_bytes)
+            ctypes.memmove(ctypes.byref(buffer, 2), string_bytes, len(string_bytes))
+        else:
+            raise ValueError(f"未知的数据类型: {data_type}")
+
+    def _read_multi_unlocked(self, items: list, encoding='gbk') -> list:
+        """多变量读取的实际执行（调用方需持有 client_lock），返回与 items 对应的值列表，失败项为 None"""
+        amounts = [self._multi_item_amount(data_type, size) for _, _, data_type, size, _ in items]
+        values = [None] * len(items)
+        for batch in self._split_multi_batches(amounts):
+            buffers = []
+            data_items = (S7DataItem * len(batch))()
+            for slot, index in enumerate(batch):
+                db_num, byte_offset, data_type, size, bit_index = items[index]
+                data_items[slot], buffer = self._make_multi_item(db_num, byte_offset, data_type, amounts[index], bit_index)
+                buffers.append(buffer)
+            self.client.read_multi_vars(data_items)
+            for slot, index in enumerate(batch):
+                db_num, byte_offset, data_type, size, bit_index = items[index]
+                if data_items[slot].Result != 0:
+                    self.logger.error(f"多变量读取DB{db_num}.{byte_offset}失败，结果代码: {data_items[slot].Result}")
+                    continue
+                try:
+                    values[index] = self._decode_multi_value(bytearray(buffers[slot]), data_type, encoding)
+                except Exception as e:
+                    self.logger.error(f"多变量读取DB{db_num}.{byte_offset}解析失败: {e}")
+        return values
+
+    def readDB_Multi(self, items: list, encoding='gbk'):
+        """
+        多变量批量读取：按PDU大小打包，一次请求读取多个变量
+            items: [(db_num, byte_offset, data_type, size, bit_index), ...]
+                   data_type 取值 bool/int/dint/real/lreal/string，string 的 size 为字符串最大长度
+        返回:
+            (成功状态, 值列表)，值列表与 items 一一对应，单个变量读取失败时对应值为 None
+        """
+        start_time = time.monotonic() if PLCClient.TIMING_ENABLED else None
+        if not self.wait_for_connection(timeout=self.connect_timeout):
+            self.logger.error(f"多变量读取{len(items)}个变量失败：PLC 未连接")
+            return False, None
+
+        try:
+            with self.client_lock:
+                values = self._read_multi_unlocked(items, encoding)
+                if self.logger.isEnabledFor(logging.DEBUG):
+                    self.logger.debug("成功多变量读取%s个变量", len(items))
+                return True, values
+        except Exception as e:
+            self.logger.error(f"多变量读取{len(items)}个变量时出现异常错误: {e}")
+            return False, None
+        finally:
+            # 记录执行时间
+            if start_time is not None:
+                self._log_execution_time("readDB_Multi", time.monotonic() - start_time)
+
+    def readDB_Ranges(self, ranges: list):
+        """
+        多段字节批量读取：能放入一个PDU响应的字节段按多变量请求打包读取（多段共用一次往返），超出的单独整段读取
+            ranges: [(db_num, byte_offset, size), ...]
+        返回:
+            (成功状态, 字节数据列表)，列表与 ranges 一一对应，单段读取失败时对应值为 None
+        """
+        start_time = time.monotonic() if PLCClient.TIMING_ENABLED else None
+        if not self.wait_for_connection(timeout=self.connect_timeout):
+            self.logger.error(f"多段读取{len(ranges)}个字节段失败：PLC 未连接")
+            return False, None
+
+        try:
+            with self.client_lock:
+                single_max = self.pdu_size - self.MULTI_HEADER_SIZE - self.MULTI_ITEM_RESP_SIZE
+                packed = [index for index, (_, _, size) in enumerate(ranges) if size <= single_max]
+                values = [None] * len(ranges)
+                if packed:
+                    items = [(ranges[index][0], ranges[index][1], "byte", ranges[index][2], None) for index in packed]
+                    for index, value in zip(packed, self._read_multi_unlocked(items)):
+                        values[index] = value
+                for index, (db_num, byte_offset, size) in enumerate(ranges):
+                    if size > single_max:
+                        try:
+                            values[index] = self.client.db_read(db_num, byte_offset, size)
+                        except Exception as e:
+                            self.logger.error(f"多段读取DB{db_num}.Byte{byte_offset}.{size}失败: {e}")
+                if self.logger.isEnabledFor(logging.DEBUG):
+                    self.logger.debug("成功多段读取%s个字节段（打包%s个）", len(ranges), len(packed))
+                return True, values
+        except Exception as e:
+            self.logger.error(f"多段读取{len(ranges)}个字节段时出现异常错误: {e}")
+            return False, None
+        finally:
+            # 记录执行时间
+            if start_time is not None:
+                self._log_execution_time("readDB_Ranges", time.monotonic() - start_time)
+
+    def writeDB_Multi(self, items: list, encoding='gbk'):
+        """
+        多变量批量写入：按PDU大小打包，一次请求写入多个变量（bool按位写入，不影响同字节其它位）
+            items: [(db_num, byte_offset, data_type, size, bit_index, value), ...]
+        返回:
+            成功状态（任一变量写入失败则返回 False）
+        """
+        start_time = time.monotonic() if PLCClient.TIMING_ENABLED else None
+        if not self.wait_for_connection(timeout=self.connect_timeout):
+            self.logger.error(f"多变量写入{len(items)}个变量失败：PLC 未连接")
+            return False
+
+        try:
+            with self.client_lock:
+                amounts = [self._multi_item_amount(data_type, size) for _, _, data_type, size, _, _ in items]
+                ok = True
+                for batch in self._split_multi_batches(amounts):
+                    buffers = []
+                    data_items = (S7DataItem * len(batch))()
+                    for slot, index in enumerate(batch):
+                        db_num, byte_offset, data_type, size, bit_index, value = items[index]
+                        data_items[slot], buffer = self._make_multi_item(db_num, byte_offset, data_type, amounts[index], bit_index)
+                        self._encode_multi_value(buffer, data_type, size, value, encoding)
+                        buffers.append(buffer)
+                    # 直接在自建的数组上调用：snap7 的 write_multi_vars 会复制一份数组，调用方拿不到各变量的结果代码
+                    check_error(self.client._lib.Cli_WriteMultiVars(self.client._s7_client, ctypes.byref(data_items),
+                                                                    ctypes.c_int32(len(batch))), context="client")
+                    self._invalidate_read_cache()
+                    for slot, index in enumerate(batch):
+                        if data_items[slot].Result != 0:
+                            ok = False
+                            db_num, byte_offset = items[index][:2]
+                            self.logger.error(f"多变量写入DB{db_num}.{byte_offset}失败，结果代码: {data_items[slot].Result}")
+                if ok and self.logger.isEnabledFor(logging.DEBUG):
+                    self.logger.debug("成功多变量写入%s个变量", len(items))
+                return ok
+        except Exception as e:
+            self.logger.error(f"多变量写入{len(items)}个变量时出现异常错误: {e}")
+            return False
+        finally:
+            # 记录执行时间
+            if start_time is not None:
+                self._log_execution_time("writeDB_Multi", time.monotonic() - start_time)
 
 
 # -------------------------- 多线程测试示例 --------------------------
@@ -814,6 +1433,4 @@ if __name__ == '__main__':
         print(f"程序运行异常: {e}")
     finally:
         if 'plc_client' in locals():
-            plc_client.stop_monitor_thread()
-            plc_client.stop_heart_thread()
-            plc_client.disconnect()
\ No newline at end of file
+            plc_client.close()
\ No newline at end of file
@@ -1,9 +1,14 @@
 import os
+import sys
+import atexit
 import logging
-import inspect
+import queue
+import threading
 import uuid
-from logging.handlers import RotatingFileHandler
+from contextlib import contextmanager
+from logging.handlers import RotatingFileHandler, QueueHandler, QueueListener
 from datetime import datetime
+from functools import lru_cache, partial
 
 
 # 定义颜色代码
@@ -37,13 +42,108 @@ class ColoredFormatter(logging.Formatter):
         return f"{color}{message}{LogColors.RESET}"
 
 
+# 日志格式中未使用进程/线程/多进程信息，关闭后标准库创建日志记录时不再逐条查询
+logging.logProcesses = False
+logging.logThreads = False
+logging.logMultiprocessing = False
+
+# 日志格式（所有日志实例共用）
+LOG_FORMAT = '%(asctime)s - %(name)s - %(levelname)s - %(message)s - %(filename)s:%(lineno)d'
+
+
+class _LogRouter(logging.Handler):
+    """在共享的日志写入线程中，按记录器名称把日志分发到各自的文件处理器，并统一输出到控制台"""
+
+    def __init__(self):
+        super().__init__()
+        # {记录器名称: 文件处理器}
+        self.file_handlers = {}
+        self.console_handler = None
+
+    def handle(self, record):
+        file_handler = self.file_handlers.get(record.name)
+        if file_handler is not None and record.levelno >= file_handler.level:
+            file_handler.handle(record)
+        console_handler = self.console_handler
+        if console_handler is not None and record.levelno >= console_handler.level:
+            console_handler.handle(record)
+        return True
+
+
+class _DeferredQueueHandler(QueueHandler):
+    """入队前只拼接消息与参数，时间、格式串、异常堆栈等格式化推迟到写入线程中完成
+
+    参数在业务线程中转为文本：参数对象（如对象池中复用的监控事件）在记录日志后被修改或回收，不影响日志内容
+    """
+
+    def prepare(self, record):
+        record.msg = record.getMessage()
+        record.args = None
+        return record
+
+
+# 控制台日志带颜色，所有日志实例共用一个格式化器
+_console_formatter = ColoredFormatter(LOG_FORMAT)
+
+
+@lru_cache(maxsize=None)
+def _file_formatter(name):
+    """文件日志的格式化器：每个日志文件只对应一个记录器，记录器名称直接写入格式串，不再逐条替换"""
+    return logging.Formatter(LOG_FORMAT.replace('%(name)s', name.replace('%', '%%')), validate=False)
+# 所有日志实例共用一个队列和一个写入线程，业务线程只负责入队
+_log_queue = queue.SimpleQueue()
+_log_router = _LogRouter()
+_log_listener = None
+_log_lock = threading.Lock()
+
+
+def _register_log_file(name, file_handler):
+    """登记日志文件处理器，首次调用时创建控制台处理器并启动共享写入线程，返回共享写入线程"""
+    global _log_listener
+    with _log_lock:
+        _log_router.file_handlers[name] = file_handler
+        if _log_router.console_handler is None:
+            console_handler = logging.StreamHandler()
+            console_handler.setFormatter(_console_formatter)
+            _log_router.console_handler = console_handler
+        if _log_listener is None:
+            _log_listener = QueueListener(_log_queue, _log_router)
+            _log_listener.start()
+            atexit.register(stop_logging)
+        return _log_listener
+
+
+def stop_logging():
+    """停止共享写入线程（会先写完队列中剩余的日志）并关闭所有文件"""
+    global _log_listener
+    with _log_lock:
+        if _log_listener is not None:
+            _log_listener.stop()
+            _log_listener = None
+        for file_handler in _log_router.file_handlers.values():
+            file_handler.close()
+
+
 class AppLogger:
     """
     作者：尉
     创建日期：2025/12/13
     应用程序日志类，提供统一的日志记录功能，支持多个独立实例
+    同名称、同目录重复创建时返回已有实例
     """
 
+    # {(名称, 日志目录): 实例}
+    _instances = {}
+
+    def __new__(cls, name: str = None, log_dir: str = 'logs', *args, **kwargs):
+        if name is None:
+            return super().__new__(cls)
+        key = (name, log_dir)
+        instance = cls._instances.get(key)
+        if instance is None:
+            instance = cls._instances.setdefault(key, super().__new__(cls))
+        return instance
+
     def __init__(self, name: str = None, log_dir: str = 'logs', level: object = logging.INFO,
                  max_bytes: int = 10 * 1024 * 1024,
                  backup_count: int = 10) -> None:
@@ -56,15 +156,33 @@ class AppLogger:
             max_bytes (int): 单个日志文件最大字节数
             backup_count (int): 保留的备份文件数量
         """
+        # 已初始化的实例（重复创建）只更新日志级别
+        if getattr(self, '_initialized', False):
+            if level != self.level:
+                self.level = level
+                self.set_level(level)
+            return
+        self._initialized = True
         # 生成唯一名称（如果未提供）
         self.name = name or f"app_logger_{uuid.uuid4().hex[:8]}"
         self.log_dir = log_dir
         self.max_bytes = max_bytes
         self.backup_count = backup_count
         self.level = level
+        self._listener = None
         # 创建日志记录器
         self.logger = logging.getLogger(self.name)
         self.logger.setLevel(self.level)
+        # 绑定级别判断方法，各级别方法先判断再调用，未启用的级别直接返回
+        self._enabled_for = self.logger.isEnabledFor
+        # 线程内固定的调用位置（call_site 设置），设置后不再由标准库回溯栈帧查找调用者
+        self._log_ctx = threading.local()
+        # 预绑定各级别方法：实例属性覆盖类中的同名方法，调用时少一层方法查找与转发
+        self.debug = partial(self._log_at, logging.DEBUG)
+        self.info = partial(self._log_at, logging.INFO)
+        self.warning = partial(self._log_at, logging.WARNING)
+        self.error = partial(self._log_at, logging.ERROR)
+        self.critical = partial(self._log_at, logging.CRITICAL)
 
         self.set_level(self.level)
 
@@ -72,30 +190,20 @@ class AppLogger:
         if not self.logger.handlers:
             self.setup_logging()
         else:
-            # 如果已有处理器，只需更新格式化器以包含调用者信息
+            # 如果已有处理器，只需更新格式化器
             self._update_formatters()
+            self._listener = _log_listener
 
     def setup_logging(self):
         """配置日志记录器"""
-        # 创建日志目录
-        if not os.path.exists(self.log_dir):
-            os.makedirs(self.log_dir)
+        # 创建日志目录（已存在时不报错）
+        os.makedirs(self.log_dir, exist_ok=True)
 
         # 生成日志文件名（包含日期）
         current_date = datetime.now().strftime('%Y-%m-%d')
         log_filename = f"{self.log_dir}/{self.name}_{current_date}.log"
 
-        # 创建格式化器 - 文件日志不使用颜色
-        file_formatter = logging.Formatter(
-            '%(asctime)s - %(name)s - %(levelname)s - %(message)s - %(filename)s:%(lineno)d'
-        )
-
-        # 控制台日志使用带颜色的格式化器
-        console_formatter = ColoredFormatter(
-            '%(asctime)s - %(name)s - %(levelname)s - %(message)s - %(filename)s:%(lineno)d'
-        )
-
-        # 创建文件处理器（带日志回滚）
+        # 创建文件处理器（带日志回滚），由共享写入线程负责写入
         file_handler = RotatingFileHandler(
             filename=log_filename,
             maxBytes=self.max_bytes,
@@ -103,91 +211,64 @@ class AppLogger:
             encoding='utf-8'
         )
         file_handler.setLevel(self.level)
-        file_handler.setFormatter(file_formatter)
-
-        # 创建控制台处理器
-        console_handler = logging.StreamHandler()
-        console_handler.setLevel(self.level)
-        console_handler.setFormatter(console_formatter)
+        file_handler.setFormatter(_file_formatter(self.name))
+        # 共享写入线程（QueueListener），停止时由 stop_logging 统一处理
+        self._listener = _register_log_file(self.name, file_handler)
 
-        # 添加处理器到记录器
-        self.logger.addHandler(file_handler)
-        self.logger.addHandler(console_handler)
+        # 记录器只挂一个队列处理器，格式化与文件/控制台输出都在写入线程中完成
+        queue_handler = _DeferredQueueHandler(_log_queue)
+        queue_handler.setLevel(self.level)
+        self.logger.addHandler(queue_handler)
+        self.logger.propagate = False
 
         self.info('===== 日志初始化完成 =====')
 
     def _update_formatters(self):
-        """更新所有处理器的格式化器以包含调用者信息"""
-        # 文件日志格式化器
-        file_formatter = logging.Formatter(
-            '%(asctime)s - %(name)s - %(levelname)s - %(message)s - %(filename)s:%(lineno)d'
-        )
-
-        # 控制台日志格式化器（带颜色）
-        console_formatter = ColoredFormatter(
-            '%(asctime)s - %(name)s - %(levelname)s - %(message)s - %(filename)s:%(lineno)d'
-        )
-
-        for handler in self.logger.handlers:
-            if isinstance(handler, logging.StreamHandler):
-                handler.setFormatter(console_formatter)
-            else:
-                handler.setFormatter(file_formatter)
-
-    def _get_caller_info(self):
-        """获取调用者信息（文件名和行号）"""
-        # 获取调用堆栈
-        stack = inspect.stack()
-        # 跳过当前方法（_get_caller_info）和日志方法（debug, info等）
-        # 查找第一个不在当前类中的调用帧
-        for frame in stack[2:]:
-            if not frame.filename.endswith(__file__):
-                # 只返回文件名，不包含路径
-                filename = os.path.basename(frame.filename)
-                return filename, frame.lineno
-        # 如果找不到外部调用者，返回未知
-        return "unknown", 0
-
-    def _log_with_caller_info(self, level, msg, *args, **kwargs):
-        """记录带有调用者信息的日志"""
-        # 创建LogRecord并手动设置文件名和行号
-        filename, lineno = self._get_caller_info()
-
-        # 创建一个新的记录
-        record = self.logger.makeRecord(
-            self.name, level, filename, lineno, msg, args, None, None, None
-        )
-
-        # 处理异常信息
-        if 'exc_info' in kwargs and kwargs['exc_info']:
-            record.exc_info = kwargs['exc_info']
+        """更新文件处理器的格式化器"""
+        file_handler = _log_router.file_handlers.get(self.name)
+        if file_handler is not None:
+            file_handler.setFormatter(_file_formatter(self.name))
 
+    @contextmanager
+    def call_site(self, filename: str, lineno: int):
+        """
+        在 with 块内为当前线程固定日志的调用位置（文件名、行号），
+        适用于调用位置不变的热点循环，记录日志时跳过标准库的栈帧回溯
+        """
+        ctx = self._log_ctx
+        previous = getattr(ctx, 'site', None)
+        ctx.site = (filename, lineno)
+        try:
+            yield self
+        finally:
+            ctx.site = previous
+
+    def _log(self, level, msg, args, kwargs):
+        """记录日志：当前线程设置了固定调用位置时直接构造日志记录，否则交给标准库（stacklevel=3 指向调用 AppLogger 方法的位置）"""
+        site = getattr(self._log_ctx, 'site', None)
+        if site is None:
+            self.logger.log(level, msg, *args, stacklevel=3, **kwargs)
+            return
+        exc_info = kwargs.get('exc_info')
+        if exc_info:
+            if isinstance(exc_info, BaseException):
+                exc_info = (type(exc_info), exc_info, exc_info.__traceback__)
+            elif not isinstance(exc_info, tuple):
+                exc_info = sys.exc_info()
+        record = self.logger.makeRecord(self.name, level, site[0], site[1], msg, args, exc_info,
+                                        extra=kwargs.get('extra'))
         self.logger.handle(record)
 
-    def debug(self, msg, *args, **kwargs):
-        """记录调试信息"""
-        self._log_with_caller_info(logging.DEBUG, msg, *args, **kwargs)
-
-    def info(self, msg, *args, **kwargs):
-        """记录普通信息"""
-        self._log_with_caller_info(logging.INFO, msg, *args, **kwargs)
-
-    def warning(self, msg, *args, **kwargs):
-        """记录警告信息"""
-        self._log_with_caller_info(logging.WARNING, msg, *args, **kwargs)
-
-    def error(self, msg, *args, **kwargs):
-        """记录错误信息"""
-        self._log_with_caller_info(logging.ERROR, msg, *args, **kwargs)
-
-    def critical(self, msg, *args, **kwargs):
-        """记录严重错误信息"""
-        self._log_with_caller_info(logging.CRITICAL, msg, *args, **kwargs)
+    def _log_at(self, level, msg, *args, **kwargs):
+        """按级别记录日志：debug/info/warning/error/critical 均为在 __init__ 中预绑定级别的本方法"""
+        if self._enabled_for(level):
+            self._log(level, msg, args, kwargs)
 
     def exception(self, msg, *args, **kwargs):
         """记录异常信息（包括堆栈跟踪）"""
-        kwargs['exc_info'] = True
-        self._log_with_caller_info(logging.ERROR, msg, *args, **kwargs)
+        if self._enabled_for(logging.ERROR):
+            kwargs['exc_info'] = True
+            self._log(logging.ERROR, msg, args, kwargs)
 
     def add_handler(self, handler):
         """添加自定义处理器"""
@@ -197,11 +278,18 @@ class AppLogger:
         """移除处理器"""
         self.logger.removeHandler(handler)
 
+    def isEnabledFor(self, level):
+        """判断指定级别的日志是否会被记录，用于在热路径上跳过日志参数的构造"""
+        return self._enabled_for(level)
+
     def set_level(self, level):
         """设置日志级别"""
         self.logger.setLevel(level)
         for handler in self.logger.handlers:
             handler.setLevel(level)
+        file_handler = _log_router.file_handlers.get(self.name)
+        if file_handler is not None:
+            file_handler.setLevel(level)
 
 
 ####  预定义一个通用的日志实列作为通用存  ####
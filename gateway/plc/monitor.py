@@ -77,39 +77,171 @@ EdgeType：枚举类
 这个设计提供了一个灵活且健壮的变量监控框架，可以根据具体需求进行扩展和定制。
 """
 from gateway.plc import log
+import atexit
 import threading
 import time
-import queue
+from collections import deque
+from itertools import chain
 from typing import Any, Callable, Optional
-from enum import Enum
+from enum import IntEnum
 
-class EdgeType(Enum):
-    """边沿类型枚举"""
-    RISING = "rising"  # 上升沿
-    FALLING = "falling"  # 下降沿
-    BOTH = "both"  # 双边沿
+class EdgeType(IntEnum):
+    """边沿类型枚举（取值同时作为处理函数表的下标）"""
+    RISING = 0  # 上升沿
+    FALLING = 1  # 下降沿
+    BOTH = 2  # 双边沿
+    CHANGE = 3  # 普通变化
+
+
+# 事件时间戳使用单调时钟（纳秒整数）；墙上时间由启动时记录的偏移量换算
+_now_ns = time.monotonic_ns
+_WALL_OFFSET_NS = time.time_ns() - time.monotonic_ns()
 
 
 class VariableEvent:
-    """变量事件类"""
+    """
+    变量事件类
+    布尔量的边沿变化 edge_type 为 RISING/FALLING，其它变化为 None
+    事件交给处理函数后不再复用或修改，处理函数（及其记录的日志）可以在返回后继续持有
+    """
+
+    __slots__ = ('variable_name', 'old_value', 'new_value', 'edge_type', 'timestamp')
 
     def __init__(self, variable_name: str, old_value: Any, new_value: Any, edge_type: Optional[EdgeType] = None):
         self.variable_name = variable_name
         self.old_value = old_value
         self.new_value = new_value
         self.edge_type = edge_type
-        self.timestamp = time.time()
+        # 事件产生时刻（单调时钟，纳秒），需要墙上时间时用 wall_time
+        self.timestamp = _now_ns()
+
+    @property
+    def wall_time(self) -> float:
+        """事件产生时刻对应的墙上时间（秒，同 time.time()）"""
+        return (self.timestamp + _WALL_OFFSET_NS) / 1e9
 
     def __str__(self):
-        if self.edge_type:
-            return f"{self.variable_name} {self.edge_type.value} edge: {self.old_value} -> {self.new_value}"
+        if self.edge_type is not None:
+            return f"{self.variable_name} {self.edge_type.name.lower()} edge: {self.old_value} -> {self.new_value}"
         else:
             return f"{self.variable_name} changed: {self.old_value} -> {self.new_value}"
 
 
+# 处理函数异常的日志限流：{异常类型: (上次记录时刻, 期间被抑制的次数)}，只在分发线程中访问
+HANDLER_ERROR_LOG_INTERVAL = 1.0
+_handler_error_log = {}
+
+# 布尔量边沿查表：下标为 (旧值 << 1) | 新值
+_EDGE_TABLE = (None, EdgeType.RISING, EdgeType.FALLING, None)
+
+
+class _EventDispatcher:
+    """
+    所有 VariableMonitor 共用的事件分发器：一个有界队列 + 一个分发线程，
+    队列元素为 (监控器, 事件)，由分发线程调用对应监控器注册的处理函数
+    """
+
+    QUEUE_SIZE = 4096  # 事件队列容量，分发线程阻塞时丢弃最旧的事件，避免队列无限增长
+    DRAIN_MAX = 256  # 分发线程每批最多取出的事件数
+
+    def __init__(self):
+        # 有界双端队列：满时 append 自动挤掉最旧的事件；由 _not_empty/_idle 两个条件变量（共用一把锁）保护
+        self._events = deque(maxlen=self.QUEUE_SIZE)
+        self._events_lock = threading.Lock()
+        self._not_empty = threading.Condition(self._events_lock)  # 有新事件或请求停止时唤醒分发线程
+        self._idle = threading.Condition(self._events_lock)  # 队列已空且当前批次处理完时唤醒 join
+        self._busy = False  # 分发线程是否正在处理已取出的一批事件
+        self._stopping = False  # 请求停止：分发线程处理完队列中剩余的事件后退出
+        self._thread = None
+        self._lock = threading.Lock()
+        self.dropped_events = 0
+
+    def start(self):
+        """启动分发线程（已在运行则直接返回）"""
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                with self._events_lock:
+                    self._stopping = False
+                self._thread = threading.Thread(target=self._run, name="VariableMonitor_EventDispatcher", daemon=True)
+                self._thread.start()
+
+    def stop(self, timeout: float = 5.0):
+        """请求停止并等待分发线程结束（此前入队的事件会先处理完）"""
+        with self._lock:
+            thread = self._thread
+        if thread is not None and thread.is_alive():
+            with self._not_empty:
+                self._stopping = True
+                self._not_empty.notify()
+            thread.join(timeout=timeout)
+
+    def put(self, monitor: "VariableMonitor", event: VariableEvent):
+        """事件入队（不阻塞生产者）：队列已满时丢弃最旧的一个事件"""
+        with self._not_empty:
+            full = len(self._events) == self._events.maxlen
+            self._events.append((monitor, event))
+            if full:
+                self.dropped_events += 1
+                dropped_events = self.dropped_events
+            self._not_empty.notify()
+        if full:
+            monitor.logger.warning(f"事件队列已满，丢弃最旧事件（累计丢弃 {dropped_events} 个）")
+
+    def put_many(self, items: list):
+        """批量入队 [(监控器, 事件), ...]：整批只获取一次锁、只唤醒一次分发线程，队列已满时同样丢弃最旧的事件"""
+        with self._not_empty:
+            events = self._events
+            before = len(events)
+            events.extend(items)
+            # 超出容量的部分由 deque 从队首挤掉
+            dropped = before + len(items) - len(events)
+            if dropped:
+                self.dropped_events += dropped
+                dropped_events = self.dropped_events
+            self._not_empty.notify()
+        if dropped:
+            items[0][0].logger.warning(f"事件队列已满，丢弃最旧事件（累计丢弃 {dropped_events} 个）")
+
+    def join(self):
+        """等待队列中所有事件处理完成"""
+        with self._idle:
+            while self._events or self._busy:
+                self._idle.wait()
+
+    def _run(self):
+        """分发线程函数：有事件时一次取出此刻已排队的事件（最多 DRAIN_MAX 个），按入队顺序成批处理"""
+        events = self._events
+        popleft = events.popleft
+        while True:
+            with self._not_empty:
+                # 阻塞等待事件，不定时唤醒；停止时由 stop 唤醒
+                while not events and not self._stopping:
+                    self._not_empty.wait()
+                if not events:
+                    # 已请求停止且队列已空
+                    self._idle.notify_all()
+                    break
+                batch = [popleft() for _ in range(min(len(events), self.DRAIN_MAX))]
+                self._busy = True
+            for monitor, event in batch:
+                try:
+                    monitor._dispatch(event)
+                except Exception as e:
+                    monitor.logger.error(f"事件消费过程中发生异常: {e}")
+            with self._idle:
+                self._busy = False
+                if not events:
+                    self._idle.notify_all()
+
+
+_DISPATCHER = _EventDispatcher()
+atexit.register(_DISPATCHER.stop)
+
+
 class VariableMonitor:
     """
     变量监控类，支持值变化检测和边沿事件触发
+    事件由所有监控器共用的分发线程处理；未调用 start_consumer 的监控器只记录值，不产生事件
     """
 
     def __init__(self, name: str, logger: log.AppLogger, initial_value: Any = None):
@@ -124,56 +256,70 @@ class VariableMonitor:
         self.logger = logger
         self._value = initial_value
         self._old_value = initial_value
-        self._lock = threading.RLock()
-        self._event_queue = queue.Queue()
-        self._event_handlers = {
-            EdgeType.RISING: [],
-            EdgeType.FALLING: [],
-            EdgeType.BOTH: [],
-            "change": []  # 普通变化事件
-        }
-        self._consumer_thread = None
-        self._running = False
-
-        # 启动事件消费者线程
-        # self.start_consumer()
+        # 只保护新旧值交换，不存在重入，用普通锁即可
+        self._lock = threading.Lock()
+        # 处理函数表，按 EdgeType 取值下标访问；每项为元组，注册时整体替换（写时复制），分发线程读取时无需加锁
+        self._event_handlers = [(), (), (), ()]
+        self._handler_count = 0  # 已注册的处理函数总数，为0时值变化不产生事件
+        # 只在注册处理函数时使用：保证并发注册时替换元组与计数不丢失，读取处理函数表仍不加锁
+        self._handlers_lock = threading.Lock()
+        # 是否已启用事件分发（start_consumer 置位，stop_consumer 清除）
+        self._active = False
 
     @property
     def value(self) -> Any:
-        """获取当前值"""
-        with self._lock:
-            return self._value
+        """获取当前值（单次属性读取本身是原子的，无需加锁）"""
+        return self._value
 
     @value.setter
     def value(self, new_value: Any):
         """设置新值并检测变化"""
+        event = self._update(new_value)
+        if event is not None:
+            _DISPATCHER.put(self, event)
+
+    @staticmethod
+    def batch_update(updates: list):
+        """
+        批量设置多个监控器的新值 [(监控器, 新值), ...]：各自检测变化，产生的事件整批一次入队
+        适用于周期读取这类一次更新大量变量的场景
+        """
+        items = []
+        for monitor, new_value in updates:
+            event = monitor._update(new_value)
+            if event is not None:
+                items.append((monitor, event))
+        if items:
+            _DISPATCHER.put_many(items)
+
+    def _update(self, new_value: Any) -> Optional[VariableEvent]:
+        """交换新旧值并检测变化，返回需要入队的事件（没有则返回None）"""
+        # 锁内只做新旧值交换，事件生成与入队在锁外完成
         with self._lock:
             old_value = self._value
             self._value = new_value
 
-            # 检测值变化
-            if old_value != new_value:
-                self._detect_change(old_value, new_value)
-
-    def _detect_change(self, old_value: Any, new_value: Any):
-        """检测值变化并生成相应事件"""
-        # 创建普通变化事件
-        change_event = VariableEvent(self.name, old_value, new_value)
-        self._event_queue.put(("change", change_event))
-
-        # 检测布尔值的边沿变化
-        if isinstance(old_value, bool) and isinstance(new_value, bool):
-            if old_value is False and new_value is True:
-                # 上升沿事件
-                edge_event = VariableEvent(self.name, old_value, new_value, EdgeType.RISING)
-                self._event_queue.put((EdgeType.RISING, edge_event))
-                self._event_queue.put((EdgeType.BOTH, edge_event))
-
-            elif old_value is True and new_value is False:
-                # 下降沿事件
-                edge_event = VariableEvent(self.name, old_value, new_value, EdgeType.FALLING)
-                self._event_queue.put((EdgeType.FALLING, edge_event))
-                self._event_queue.put((EdgeType.BOTH, edge_event))
+        # 检测值变化（未启用事件分发时不产生事件）
+        if self._active and old_value != new_value:
+            return self._detect_change(old_value, new_value)
+        return None
+
+    def _detect_change(self, old_value: Any, new_value: Any) -> Optional[VariableEvent]:
+        """检测值变化并生成相应事件：每次变化只产生一个事件，布尔量的边沿类型记录在事件的 edge_type 中"""
+        # 没有任何处理函数时不产生事件
+        if not self._handler_count:
+            return None
+        handlers = self._event_handlers
+        edge_type = None
+        # 检测布尔值的边沿变化：(旧值, 新值) 编码为2位整数查表，01 为上升沿，10 为下降沿
+        if type(old_value) is bool and type(new_value) is bool:
+            edge_type = _EDGE_TABLE[(old_value << 1) | new_value]
+        # 只有会被处理的事件才入队
+        if not handlers[EdgeType.CHANGE] and (
+                edge_type is None or not (handlers[edge_type] or handlers[EdgeType.BOTH])):
+            return None
+
+        return VariableEvent(self.name, old_value, new_value, edge_type)
 
     def register_handler(self, event_type: EdgeType, handler: Callable[[VariableEvent], None]):
         """
@@ -183,10 +329,9 @@ class VariableMonitor:
             event_type (EdgeType): 事件类型
             handler (Callable): 处理函数，接受一个VariableEvent参数
         """
-        with self._lock:
-            if event_type not in self._event_handlers:
-                self._event_handlers[event_type] = []
-            self._event_handlers[event_type].append(handler)
+        with self._handlers_lock:
+            self._event_handlers[event_type] = self._event_handlers[event_type] + (handler,)
+            self._handler_count += 1
 
     def register_change_handler(self, handler: Callable[[VariableEvent], None]):
         """
@@ -195,64 +340,54 @@ class VariableMonitor:
         参数:
             handler (Callable): 处理函数，接受一个VariableEvent参数
         """
-        with self._lock:
-            self._event_handlers["change"].append(handler)
-
-    def _event_consumer(self):
-        """事件消费者线程函数"""
-        self.logger.info(f"变量 '{self.name}' 事件消费者线程工作中...")
-
-        while self._running or not self._event_queue.empty():
+        self.register_handler(EdgeType.CHANGE, handler)
+
+    def _dispatch(self, event: VariableEvent):
+        """在分发线程中处理事件：依次分发给普通变化、对应边沿、双边沿的处理函数"""
+        handlers = self._event_handlers
+        edge_type = event.edge_type
+        if edge_type is None:
+            dispatch = handlers[EdgeType.CHANGE]
+        else:
+            dispatch = chain(handlers[EdgeType.CHANGE], handlers[edge_type], handlers[EdgeType.BOTH])
+        for handler in dispatch:
             try:
-                # 从队列获取事件，设置超时以便定期检查运行状态
-                event_type, event = self._event_queue.get(timeout=1.0)
-
-                # 处理事件
-                if event_type in self._event_handlers:
-                    for handler in self._event_handlers[event_type]:
-                        try:
-                            handler(event)
-                        except Exception as e:
-                            self.logger.error(f"事件处理函数执行失败: {e}")
-
-                # 标记任务完成
-                self._event_queue.task_done()
-
-            except queue.Empty:
-                # 队列为空，继续循环
-                continue
+                handler(event)
             except Exception as e:
-                self.logger.error(f"事件消费过程中发生异常: {e}")
-
-        self.logger.warning(f"变量 '{self.name}' 事件消费者线程停止")
+                self._log_handler_error(e)
+
+    def _log_handler_error(self, e: Exception):
+        """记录处理函数异常（含堆栈）：同一异常类型每 HANDLER_ERROR_LOG_INTERVAL 秒最多记录一次，避免异常风暴刷满日志"""
+        now = time.monotonic()
+        key = type(e)
+        last, suppressed = _handler_error_log.get(key, (0.0, 0))
+        if now - last < HANDLER_ERROR_LOG_INTERVAL:
+            _handler_error_log[key] = (last, suppressed + 1)
+            return
+        _handler_error_log[key] = (now, 0)
+        if suppressed:
+            self.logger.error(f"事件处理函数执行失败: {e}（此前 {suppressed} 次同类异常未记录）", exc_info=e)
+        else:
+            self.logger.error(f"事件处理函数执行失败: {e}", exc_info=e)
 
     def start_consumer(self):
-        """启动事件消费者线程"""
-        with self._lock:
-            if self._consumer_thread is None or not self._consumer_thread.is_alive():
-                self._running = True
-                self._consumer_thread = threading.Thread(
-                    target=self._event_consumer,
-                    name=f"{self.name}_EventConsumer",
-                    daemon=True
-                )
-                self._consumer_thread.start()
-                self.logger.info(f"启动变量 '{self.name}' 的事件消费者线程")
+        """启用本变量的事件分发（共用的分发线程未运行时启动它）"""
+        _DISPATCHER.start()
+        if not self._active:
+            self._active = True
+            self.logger.info(f"启动变量 '{self.name}' 的事件分发")
 
     def stop_consumer(self):
-        """停止事件消费者线程"""
-        with self._lock:
-            self._running = False
+        """停止本变量的事件分发：之后的值变化不再产生事件，已入队的事件仍会被处理（分发线程在程序退出时停止）"""
+        self._active = False
 
-        # 等待线程结束
-        if self._consumer_thread and self._consumer_thread.is_alive():
-            self._consumer_thread.join(timeout=5.0)
-            if self._consumer_thread.is_alive():
-                self.logger.warning(f"变量 '{self.name}' 的事件消费者线程未能正常停止")
+    def close(self):
+        """显式释放：停止本变量的事件分发（监控器不持有线程，无需析构函数；共用分发线程由 atexit 停止）"""
+        self.stop_consumer()
 
     def wait_until_processed(self, timeout: Optional[float] = None):
         """
-        等待所有事件处理完成
+        等待所有事件处理完成（分发队列为所有变量共用，会等待全部变量的事件）
 
         参数:
             timeout (float): 超时时间，None表示无限等待
@@ -260,11 +395,7 @@ class VariableMonitor:
         返回:
             bool: 是否所有事件都已处理完成
         """
-        return self._event_queue.join()
-
-    def __del__(self):
-        """析构函数，确保资源被正确释放"""
-        self.stop_consumer()
+        return _DISPATCHER.join()
 
 
 # 使用示例
@@ -296,6 +427,7 @@ if __name__ == "__main__":
     bool_monitor.register_handler(EdgeType.RISING, handle_rising_edge)
     bool_monitor.register_handler(EdgeType.FALLING, handle_falling_edge)
     bool_monitor.register_change_handler(handle_change)
+    bool_monitor.start_consumer()
 
     # 模拟变量变化
     print("=== 模拟变量变化 ===")
@@ -10,14 +10,50 @@ from gateway.plc.monitor import VariableMonitor
 #from snap7 import types
 from snap7.util import *
 from typing import Dict, List, Any, Optional
-#import struct
+import struct
 import threading
 import time
 import logging
+import re
+import codecs
+from bisect import bisect_left
+from collections import namedtuple
+
+# 标签配置记录：字段顺序与 config_plc_tags 查询的列顺序一致，可由查询结果行直接构造
+TagDef = namedtuple('TagDef', 'plc group tagpath name description default_value config_monitor '
+                              'data_type db_number start_offset bit_index size')
+# 标签地址信息：创建标签时生成一次，读写时直接按元组解包
+TagAddress = namedtuple('TagAddress', 'db_number start_offset size data_type bit_index')
+
+# 各数据类型在字节数组中的解析/打包函数（bool 需绑定位索引，在标签创建时生成；string 单独处理）
+# 解析函数统一返回单元素元组：数值类型直接使用预编译 Struct 的 unpack_from（大端），按偏移量从缓冲区读取
+_PARSE = {'int': struct.Struct('>h').unpack_from, 'dint': struct.Struct('>i').unpack_from,
+          'real': struct.Struct('>f').unpack_from, 'lreal': struct.Struct('>d').unpack_from}
+_SERIALIZE = {'int': set_int, 'dint': set_dint, 'real': set_real, 'lreal': set_lreal}
+# 数值类型的 struct 格式码（大端，不对齐），用于把一个读取区间内的数值标签合并为一个 Struct 一次解析
+_STRUCT_CODES = {'int': 'h', 'dint': 'i', 'real': 'f', 'lreal': 'd'}
+# 各数据类型对应的 PLCClient 单值读写方法名
+_CLIENT_READ = {'bool': 'readDB_Bit', 'int': 'readDB_Int', 'dint': 'readDB_DInt', 'real': 'readDB_Real',
+                'lreal': 'readDB_LReal', 'string': 'readDB_String'}
+_CLIENT_WRITE = {'bool': 'writeDB_Bit', 'int': 'writeDB_Int', 'dint': 'writeDB_DInt', 'real': 'writeDB_Real',
+                 'lreal': 'writeDB_LReal', 'string': 'writeDB_String'}
+
+# PLC字符串编码：编码函数和增量解码器类只查找一次；增量解码器（非 final 模式）会把末尾不完整的
+# 多字节字符留在内部缓冲而不是抛出异常，用来丢弃被截断的半个中文字符
+STRING_ENCODING = 'gbk'
+_encode_plc_string = codecs.getencoder(STRING_ENCODING)
+_PLCStringDecoder = codecs.getincrementaldecoder(STRING_ENCODING)
+
+# 批量写入时的字节占用标记：连续的非0字节为一个写入段；0x01~0xFE 表示该字节只有部分位待写入
+_OWNED_RUN = re.compile(rb'[^\x00]+')
+_PARTIAL_BYTE = re.compile(rb'[\x01-\xfe]')
 
 class DBPLCTag():
     """DB区域PLC标签的封装类"""
 
+    # real/lreal 新旧值之差不超过该值时视为未变化，不更新标签值（默认0，即精确比较）
+    FLOAT_TOLERANCE = 0.0
+
     def __init__(self,
                  logger: AppLogger,
                  name: str,
@@ -62,6 +98,28 @@ class DBPLCTag():
         self.description = description
         self.default_value = default_value
         self.config_monitor = config_monitor
+        self._addr_info = TagAddress(db_number, start_offset, size, data_type, bit_index)
+        # 标签占用的最后一个字节的偏移量（string 含2字节头部）
+        self._end_offset = start_offset + size + 1 if data_type == 'string' else start_offset + size - 1
+        # bool 标签在所在字节中的位掩码（非 bool 为None）
+        self._bit_mask = 1 << bit_index if data_type == 'bool' and bit_index is not None else None
+        # 按数据类型预先选定解析/打包函数和PLC读写方法，读写时不再逐个比较类型字符串（string、未知类型为None）
+        if self._bit_mask is not None:
+            bit_mask = self._bit_mask
+            self._parse = lambda data, offset: (data[offset] & bit_mask != 0,)
+            self._serialize = lambda data, offset, value: set_bool(data, offset, bit_index, value)
+        else:
+            self._parse = _PARSE.get(data_type)
+            self._serialize = _SERIALIZE.get(data_type)
+        self._client_read = _CLIENT_READ.get(data_type)
+        self._client_write = _CLIENT_WRITE.get(data_type)
+        # PLCClient 单值读写的地址参数：bool 附带位索引，string 附带长度
+        if data_type == 'bool':
+            self._client_args = (db_number, start_offset, bit_index)
+        elif data_type == 'string':
+            self._client_args = (db_number, start_offset, size)
+        else:
+            self._client_args = (db_number, start_offset)
 
         # 组合监听属性
         self.monitor = VariableMonitor(tagpath, logger, initial_value=default_value)
@@ -69,27 +127,52 @@ class DBPLCTag():
             self.monitor.start_consumer()
 
         # 当前值和待写入值
-        self._value = None
+        # (当前值, 更新时间) 打包为一个元组整体赋值，读取时无需加锁即可拿到一致的快照
+        self._state = (None, 0)
         self._pending_write_value = None
-        self._last_update_time = 0
-        self._value_lock = threading.RLock()
+        # 只在写入时加锁（读取依赖单次引用读写的原子性），不存在重入，用普通锁即可
+        self._value_lock = threading.Lock()
 
 
 
     @property
     def value(self) -> Any:
         """获取标签当前值"""
-        with self._value_lock:
-            return self._value
+        return self._state[0]
 
     @value.setter
     def value(self, new_value: Any):
-        """设置标签值，但不立即写入PLC"""
+        """设置标签值，但不立即写入PLC；值未变化时直接返回，不加锁也不通知监听器"""
+        if self._is_unchanged(new_value):
+            return
         with self._value_lock:
-            self._value = new_value
-            self._last_update_time = time.time()
+            self._state = (new_value, time.time())
             self.monitor.value = new_value
 
+    def _is_unchanged(self, new_value: Any) -> bool:
+        """新值与当前值相同（real/lreal 在 FLOAT_TOLERANCE 以内）时返回True"""
+        old_value = self._state[0]
+        # 类型也需相同，避免 True == 1、1 == 1.0 这类跨类型相等被当作未变化
+        if type(new_value) is not type(old_value):
+            return False
+        if new_value == old_value:
+            return True
+        return bool(DBPLCTag.FLOAT_TOLERANCE and type(new_value) is float
+                    and abs(new_value - old_value) <= DBPLCTag.FLOAT_TOLERANCE)
+
+    def _store_value(self, new_value: Any) -> bool:
+        """只更新标签值、不通知监听器（由调用方批量通知），值未变化时返回False"""
+        if self._is_unchanged(new_value):
+            return False
+        with self._value_lock:
+            self._state = (new_value, time.time())
+        return True
+
+    @property
+    def last_update_time(self) -> float:
+        """标签值最近一次变化的时间"""
+        return self._state[1]
+
     def set_pending_write_value(self, value: Any):
         """设置待写入值"""
         with self._value_lock:
@@ -97,76 +180,134 @@ class DBPLCTag():
 
     def get_pending_write_value(self) -> Any:
         """获取待写入值"""
-        with self._value_lock:
-            return self._pending_write_value
+        return self._pending_write_value
 
     def clear_pending_write_value(self):
         """清除待写入值"""
         with self._value_lock:
             self._pending_write_value = None
 
+    def _clear_pending_write_value_if(self, written_value: Any):
+        """待写入值仍是已写入的那个值时才清除；写入期间被设置的新值保留，等待下一次写入"""
+        with self._value_lock:
+            if self._pending_write_value is written_value:
+                self._pending_write_value = None
+
     def has_pending_write(self) -> bool:
         """检查是否有待写入值"""
-        with self._value_lock:
-            return self._pending_write_value is not None
-
-    def get_address_info(self) -> Dict[str, Any]:
-        """获取标签地址信息"""
-        return {
-            'db_number': self.db_number,
-            'start_offset': self.start_offset,
-            'size': self.size,
-            'data_type': self.data_type,
-            'bit_index': self.bit_index
-        }
+        return self._pending_write_value is not None
+
+    def _decode_string(self, string_bytes) -> str:
+        """解码PLC字符串内容（bytes-like），末尾被截断的半个中文字符直接丢弃；内容本身非法时抛出 UnicodeDecodeError"""
+        return _PLCStringDecoder().decode(string_bytes)
+
+    def _encode_string(self, value: str) -> tuple:
+        """
+        将字符串编码为PLC字符串内容，超出配置长度时截断（不会截断在中文字符中间）
+        :return: (编码后的字节, 是否发生截断)
+        """
+        string_bytes = _encode_plc_string(value)[0]
+        if len(string_bytes) <= self.size:
+            return string_bytes, False
+        truncated_str = _PLCStringDecoder().decode(string_bytes[:self.size])
+        return _encode_plc_string(truncated_str)[0], True
+
+    def get_address_info(self) -> TagAddress:
+        """获取标签地址信息 (db_number, start_offset, size, data_type, bit_index)"""
+        return self._addr_info
 
     def __str__(self):
         return f"DBPLCTag(tagpath={self.tagpath}, value={self.value}, type={self.data_type})"
 
 
+# 保护 DBPLCTagManager 单例的首次创建
+_instance_lock = threading.Lock()
+
 class DBPLCTagManager:
     """DB区域PLC标签管理器（静态类）"""
 
     # 单例实例
     _instance = None
-    _initialized = False
-
-    def __new__(cls, *args, **kwargs):
-        if cls._instance is None:
-            cls._instance = super(DBPLCTagManager, cls).__new__(cls)
-        return cls._instance
+    # 合并读取区间时允许跨越的最大空隙（字节）：一次读请求的往返开销约等于多读一个PDU（约200字节）
+    READ_GAP_MAX = 200
+
+    def __new__(cls, logger:AppLogger, plc_client_async:PLCClient, plc_client_sync:PLCClient):
+        # 双重检查：实例已存在时不加锁直接返回；首次创建在锁内完成构造和初始化，并发调用也只会初始化一次
+        instance = cls._instance
+        if instance is None:
+            with _instance_lock:
+                instance = cls._instance
+                if instance is None:
+                    instance = super(DBPLCTagManager, cls).__new__(cls)
+                    instance._setup(logger, plc_client_async, plc_client_sync)
+                    cls._instance = instance
+        return instance
 
     def __init__(self, logger:AppLogger, plc_client_async:PLCClient, plc_client_sync:PLCClient):
-        if not self._initialized:
-            self.tags: Dict[str, DBPLCTag] = {}
-            self._plc_client_async = plc_client_async
-            self._plc_client_sync = plc_client_sync
-            self._lock = threading.RLock()
-            self._initialized = True
-            self.logger = logger
-
-            # 周期性（异步）读取线程
-            self._background_async_read_thread = None
-            self._read_running = False
-
-            # 周期性（异步）写入线程
-            self._background_async_write_thread = None
-            self._write_running = False
-            #200ms周期间隔
-            self.interval = 0.2
-            #启动异步读取线程
-            #self.start_background_async_read()
+        """实例在 __new__ 中已完成初始化，重复构造时不做任何事"""
+
+    def _setup(self, logger:AppLogger, plc_client_async:PLCClient, plc_client_sync:PLCClient):
+        """初始化单例实例的属性（只在首次创建时调用一次）"""
+        self.tags: Dict[str, DBPLCTag] = {}
+        # 按DB块号分桶的标签索引 {db_number: {tagpath: tag}}，与 self.tags 同步维护
+        self._db_tags: Dict[int, Dict[str, DBPLCTag]] = {}
+        # 配置了监听的标签列表，创建标签时维护，注册监听回调时直接遍历
+        self.monitored_tags: List[DBPLCTag] = []
+        self._plc_client_async = plc_client_async
+        self._plc_client_sync = plc_client_sync
+        # 只保护标签集合的修改（create_tag）和后台线程启停；查询标签不加锁，
+        # 依赖单次字典操作的原子性，后台读写与前台查询互不阻塞
+        self._lock = threading.RLock()
+        self.logger = logger
+
+        # 周期性（异步）读取线程
+        self._background_async_read_thread = None
+        self._read_running = False
+        # 停止事件：周期等待期间置位即可立即唤醒线程退出
+        self._read_stop_event = threading.Event()
+
+        # 周期性（异步）写入线程
+        self._background_async_write_thread = None
+        self._write_running = False
+        self._write_stop_event = threading.Event()
+        # 批量写入的复用缓冲区 {字节数: bytearray}；write_pending_tags 可能同时被后台线程和接口调用，
+        # 缓冲区与待写入值的取出/清除都在 _write_pending_lock 内进行
+        self._write_buffers: Dict[int, bytearray] = {}
+        self._write_pending_lock = threading.Lock()
+        #200ms周期间隔
+        self.interval = 0.2
+        # 批量读取计划 [(db_number, start_offset, read_size, entries, parser), ...]，标签变化时重建
+        self._read_plan = None
+        # 单个DB块的读取计划 {db_number: (start_offset, read_size, entries, parser)}，供 read_db_tags 使用
+        self._db_read_plans: Dict[int, tuple] = {}
+        # 按字典序排列的标签路径，供 get_tags_by_group 按前缀二分查找，标签集合变化时重建
+        self._sorted_tagpaths: Optional[List[str]] = None
+        #启动异步读取线程
+        #self.start_background_async_read()
 
 
 
     @classmethod
-    def initialize(cls, logger:AppLogger, plc_client_async:PLCClient, plc_client_sync:PLCClient, tag_definitions: List[Dict]):
+    def initialize(cls, logger:AppLogger, plc_client_async:PLCClient, plc_client_sync:PLCClient, tag_definitions: List[TagDef]):
         """初始化标签管理器"""
         instance = cls(logger, plc_client_async, plc_client_sync)
 
         # 创建所有标签
         for tag_def in tag_definitions:
-            instance.create_tag(**tag_def)
+            instance.create_tag(name=tag_def.name,
+                                tagpath=tag_def.tagpath,
+                                db_number=tag_def.db_number,
+                                start_offset=tag_def.start_offset,
+                                size=tag_def.size,
+                                data_type=tag_def.data_type,
+                                bit_index=tag_def.bit_index,
+                                plc=tag_def.plc,
+                                group=tag_def.group,
+                                config_monitor=tag_def.config_monitor,
+                                default_value=tag_def.default_value,
+                                description=tag_def.description)
+        # 预先计算批量读取计划
+        instance._read_plan = instance._build_read_plan()
 
         logger.info(f"DB区域PLC标签管理器已初始化，共创建 {len(instance.tags)} 个标签")
         return instance
@@ -186,8 +327,12 @@ class DBPLCTagManager:
                    description: str = "") -> DBPLCTag:
         """创建并注册一个新标签"""
         with self._lock:
-            if tagpath in self.tags:
+            old_tag = self.tags.get(tagpath)
+            if old_tag is not None:
                 self.logger.warning(f"标签 {tagpath} 已存在，将被覆盖")
+                if old_tag.config_monitor:
+                    self.monitored_tags.remove(old_tag)
+                self._db_tags[old_tag.db_number].pop(tagpath, None)
 
             tag = DBPLCTag(
                 logger=self.logger,
@@ -206,28 +351,41 @@ class DBPLCTagManager:
             )
 
             self.tags[tagpath] = tag
+            self._db_tags.setdefault(db_number, {})[tagpath] = tag
+            if config_monitor:
+                self.monitored_tags.append(tag)
+            # 标签集合变化，读取计划需重建
+            self._read_plan = None
+            self._db_read_plans = {}
+            self._sorted_tagpaths = None
             self.logger.info(f"已创建DB标签: {tagpath}")
             return tag
 
     def get_tag(self, tagpath: str) -> Optional[DBPLCTag]:
         """获取指定名称的标签"""
-        with self._lock:
-            return self.tags.get(tagpath)
+        return self.tags.get(tagpath)
 
     def get_all_tags(self) -> Dict[str, DBPLCTag]:
         """获取所有标签"""
-        with self._lock:
-            return self.tags.copy()
+        return self.tags.copy()
 
     def get_tags_by_db(self, db_number: int) -> Dict[str, DBPLCTag]:
         """按DB块号获取标签"""
-        with self._lock:
-            return {tagpath: tag for tagpath, tag in self.tags.items() if tag.db_number == db_number}
+        return self._db_tags.get(db_number, {}).copy()
 
     def get_tags_by_group(self, group_prefix: str) -> Dict[str, DBPLCTag]:
-        """按组前缀获取标签"""
-        with self._lock:
-            return {tagpath: tag for tagpath, tag in self.tags.items() if tagpath.startswith(group_prefix)}
+        """按组前缀获取标签：在排序后的标签路径中二分定位前缀，只遍历匹配的标签"""
+        tagpaths = self._sorted_tagpaths
+        if tagpaths is None:
+            tagpaths = self._sorted_tagpaths = sorted(self.tags)
+        tags = self.tags
+        result = {}
+        for index in range(bisect_left(tagpaths, group_prefix), len(tagpaths)):
+            tagpath = tagpaths[index]
+            if not tagpath.startswith(group_prefix):
+                break
+            result[tagpath] = tags[tagpath]
+        return result
 
     def read_tag(self, tagpath: str) -> Any:
         """读取单个标签的值（实时从PLC读取）"""
@@ -239,29 +397,12 @@ class DBPLCTagManager:
             raise RuntimeError("未设置PLC客户端")
 
         # 获取变量配置信息
-        address_info = tag.get_address_info()
-        db_number = address_info['db_number']
-        start_offset = address_info['start_offset']
-        size = address_info['size']
-        data_type = address_info['data_type']
-        bit_index = address_info['bit_index']
+        if tag._client_read is None:
+            self.logger.error(f"未知的数据类型: {tag.data_type},读取失败！")
+            return None
 
         # PLC读取数据
-        if data_type == "bool":
-            result,value = self._plc_client_sync.readDB_Bit(db_number, start_offset, bit_index)
-        elif data_type == "int":
-            result,value = self._plc_client_sync.readDB_Int(db_number, start_offset)
-        elif data_type == "dint":
-            result,value = self._plc_client_sync.readDB_DInt(db_number, start_offset)
-        elif data_type == "real":
-            result,value = self._plc_client_sync.readDB_Real(db_number, start_offset)
-        elif data_type == "lreal":
-            result,value = self._plc_client_sync.readDB_LReal(db_number, start_offset)
-        elif data_type == "string":
-            result,value = self._plc_client_sync.readDB_String(db_number, start_offset, size)
-        else:
-            self.logger.error(f"未知的数据类型: {address_info['data_type']},读取失败！")
-            return None
+        result,value = getattr(self._plc_client_sync, tag._client_read)(*tag._client_args)
         if  result:
             tag.value = value
             return value
@@ -288,29 +429,12 @@ class DBPLCTagManager:
                 raise RuntimeError("未设置PLC客户端")
 
             # 获取变量配置信息
-            address_info = tag.get_address_info()
-            db_number = address_info['db_number']
-            start_offset = address_info['start_offset']
-            size = address_info['size']
-            data_type = address_info['data_type']
-            bit_index = address_info['bit_index']
+            if tag._client_write is None:
+                self.logger.error(f"未知的数据类型: {tag.data_type},写入失败！")
+                return False
 
             # 向PLC写入数据
-            if data_type == "bool":
-                result = self._plc_client_sync.writeDB_Bit(db_number, start_offset, bit_index, value)
-            elif data_type == "int":
-                result = self._plc_client_sync.writeDB_Int(db_number, start_offset, value)
-            elif data_type == "dint":
-                result = self._plc_client_sync.writeDB_DInt(db_number, start_offset, value)
-            elif data_type == "real":
-                result = self._plc_client_sync.writeDB_Real(db_number, start_offset, value)
-            elif data_type == "lreal":
-                result = self._plc_client_sync.writeDB_LReal(db_number, start_offset, value)
-            elif data_type == "string":
-                result = self._plc_client_sync.writeDB_String(db_number, start_offset, size, value)
-            else:
-                self.logger.error(f"未知的数据类型: {address_info['data_type']},写入失败！")
-                return False
+            result = getattr(self._plc_client_sync, tag._client_write)(*tag._client_args, value)
             if result:
                 # 写入成功，立马更新标签当前值
                 tag.value = value
@@ -329,96 +453,67 @@ class DBPLCTagManager:
         if self._plc_client_async is None:
             raise RuntimeError("未设置PLC客户端")
 
-        # 按DB块分组标签
-        grouped_tags = self._group_tags_by_db()
+        # 预先计算的读取计划，周期读取时不再遍历 self.tags
+        read_plan = self._read_plan
+        if read_plan is None:
+            read_plan = self._read_plan = self._build_read_plan()
+
+        return self._read_ranges(self._plc_client_async, read_plan)
 
+    def read_tags(self, tagpaths: List[str], plc_client: Optional[PLCClient] = None) -> Dict[str, Any]:
+        """实时批量读取指定标签的值：按地址合并为读取区间后一次提交，小区间打包为多变量请求
+
+        :param tagpaths: 标签路径列表
+        :param plc_client: 使用的PLC链接，为 None 时使用同步读写链接
+        :return: {标签路径: 值}，读取失败的标签值为 None
+        """
+        if plc_client is None:
+            plc_client = self._plc_client_sync
+        if plc_client is None:
+            raise RuntimeError("未设置PLC客户端")
+
+        # 去重并保持请求顺序
+        tagpaths = list(dict.fromkeys(tagpaths))
+        tags = []
+        for tagpath in tagpaths:
+            tag = self.tags.get(tagpath)
+            if tag is None:
+                raise ValueError(f"未找到标签: {tagpath}")
+            tags.append(tag)
+        if not tags:
+            return {}
+
+        # 只读：不更新标签值、不通知监控器，避免与后台周期读取交错产生虚假的变化/边沿事件
+        results = self._read_ranges(plc_client, self._build_read_plan(tags), store=False)
+        return {tagpath: results.get(tagpath) for tagpath in tagpaths}
+
+    def _read_ranges(self, plc_client: PLCClient, read_plan: List[tuple], store: bool = True) -> Dict[str, Any]:
+        """按读取计划读取并解析所有区间，值发生变化的标签统一通知监控器；store 为 False 时只返回解析结果"""
         results = {}
 
-        # 处理每个分组
-        for db_number, tags in grouped_tags.items():
-            # 计算读取范围
-            start_offset, end_offset = self._calculate_read_range(tags)
-            read_size = end_offset - start_offset + 1
+        # 所有区间（可跨DB块）一起提交，小区间按PDU打包为多变量请求，减少逐个区间的往返等待
+        ok, range_data = plc_client.readDB_Ranges(
+            [(db_number, start_offset, read_size) for db_number, start_offset, read_size, _, _ in read_plan])
+        if not ok:
+            range_data = [None] * len(read_plan)
 
+        # 本次发生变化的标签 [(监控器, 新值), ...]，全部解析完后统一通知
+        changed = [] if store else None
+        for (db_number, start_offset, read_size, entries, parser), data in zip(read_plan, range_data):
             try:
-                # 读取数据
-                result, data = self._plc_client_async.readDB_Byte(db_number, start_offset, read_size)
-                if not result:
-                    raise ValueError(f"批量读取时，未能正常获取bytes数据！")
-
+                if data is None:
+                    raise ValueError(f"批量读取DB{db_number}.{start_offset}({read_size}字节)时，未能正常获取bytes数据！")
                 # 解析每个标签的值
-                for tag in tags:
-                    relative_offset = tag.start_offset - start_offset
-                    tag_data = data[relative_offset : relative_offset + tag.size]
-
-                    if tag.data_type == 'bool' and tag.bit_index is not None:
-                        try:
-                            value = get_bool(tag_data, 0, tag.bit_index)
-                        except Exception as e:
-                            value = None
-                            self.logger.error(f"解析tag：{tag.tagpath}发生错误[{e}]，请检查变量配置是否正确！")
-                    elif tag.data_type == 'int':
-                        try:
-                            value = get_int(tag_data, 0)
-                        except Exception as e:
-                            value = None
-                            self.logger.error(f"解析tag：{tag.tagpath}发生错误[{e}]，请检查变量配置是否正确！")
-                    elif tag.data_type == 'dint':
-                        try:
-                            value = get_dint(tag_data, 0)
-                        except Exception as e:
-                            value = None
-                            self.logger.error(f"解析tag：{tag.tagpath}发生错误[{e}]，请检查变量配置是否正确！")
-                    elif tag.data_type == 'real':
-                        try:
-                            value = get_real(tag_data, 0)
-                        except Exception as e:
-                            value = None
-                            self.logger.error(f"解析tag：{tag.tagpath}发生错误[{e}]，请检查变量配置是否正确！")
-                    elif tag.data_type == 'lreal':
-                        try:
-                            value = get_lreal(tag_data, 0)
-                        except Exception as e:
-                            value = None
-                            self.logger.error(f"解析tag：{tag.tagpath}发生错误[{e}]，请检查变量配置是否正确！")
-                    elif tag.data_type == 'string':
-                        # 读取字符串数据（包括2字节的头部）
-                        buffer = data[relative_offset:relative_offset + tag.size +2]
-                        # 获取实际字符串长度（第二个字节）
-                        actual_length = buffer[1]
-
-                        # 提取字符串数据（从第2字节开始，取实际长度）
-                        string_bytes = buffer[2:2 + actual_length]
-
-                        # 解码字符串
-                        try:
-                            # 尝试使用指定编码解码
-                            value = string_bytes.decode("GBK")
-                        except UnicodeDecodeError:
-                            """
-                            如果编码失败，尝试去掉末尾一个字节重新编码，解决 尾部半个中文字符的问题
-                            """
-                            try:
-                                value = string_bytes[:-1].decode("GBK")
-                            except UnicodeDecodeError as e:
-                                value = string_bytes
-                                self.logger.error(f"批量读取时无法解码字符串{tag.tagpath}: {e}！")
-
-
-                    else:
-                            self.logger.warning(f"未知的数据类型: {tag.data_type}!")
-                            value = tag_data
-
-                    # 更新标签值
-                    tag.value = value
-                    results[tag.tagpath] = value
+                self._parse_entries(data, parser, results, changed)
 
             except (Exception,ValueError) as e:
                 self.logger.error(f"批量读取时，发生严重错误：[{e}]")
                 # 标记这些标签读取失败
-                for tag in tags:
-                    results[tag.tagpath] = None
+                for entry in entries:
+                    results[entry[1]] = None
 
+        if changed:
+            VariableMonitor.batch_update(changed)
         return results
 
     def read_db_tags(self, db_number: int) -> Dict[str, Any]:
@@ -426,77 +521,87 @@ class DBPLCTagManager:
         if self._plc_client_async is None:
             raise RuntimeError("未设置PLC客户端")
 
-        # 获取指定DB块的所有标签
-        db_tags = self.get_tags_by_db(db_number)
-        if not db_tags:
+        # 预先计算的单个DB块读取计划，标签集合变化时重建
+        db_plan = self._db_read_plans.get(db_number)
+        if db_plan is None:
+            db_plan = self._db_read_plans[db_number] = self._build_db_read_plan(db_number)
+        start_offset, read_size, entries, parser = db_plan
+        if not entries:
             return {}
 
-        # 计算读取范围
-        tags_list = list(db_tags.values())
-        start_offset, end_offset = self._calculate_read_range(tags_list)
-        read_size = end_offset - start_offset + 1
-
         results = {}
+        changed = []
 
         try:
             # 读取数据
             result, data = self._plc_client_async.readDB_Byte(db_number, start_offset, read_size)
+            if not result:
+                raise ValueError(f"未能正常获取bytes数据！")
 
             # 解析每个标签的值
-            for tag in tags_list:
-                relative_offset = tag.start_offset - start_offset
-                tag_data = data[relative_offset:relative_offset + tag.size]
-
-                if tag.data_type == 'bool' and tag.bit_index is not None:
-                    value = get_bool(tag_data, 0, tag.bit_index)
-                elif tag.data_type == 'int':
-                    value = get_int(tag_data, 0)
-                elif tag.data_type == 'dint':
-                    value = get_dint(tag_data, 0)
-                elif tag.data_type == 'real':
-                    value = get_real(tag_data, 0)
-                elif tag.data_type == 'lreal':
-                    value = get_lreal(tag_data, 0)
-                elif tag.data_type == 'string':
-                    # 读取字符串数据（包括2字节的头部）
-                    buffer = data[relative_offset:relative_offset + tag.size + 2]
-                    # 获取实际字符串长度（第二个字节）
-                    actual_length = buffer[1]
-
-                    # 提取字符串数据（从第2字节开始，取实际长度）
-                    string_bytes = buffer[2:2 + actual_length]
-
-                    # 解码字符串
-                    try:
-                        # 尝试使用指定编码解码
-                        value = string_bytes.decode("GBK")
-                    except UnicodeDecodeError:
-                        """
-                        如果编码失败，尝试去掉末尾一个字节重新编码，解决 尾部半个中文字符的问题
-                        """
-                        try:
-                            value = string_bytes[:-1].decode("GBK")
-                        except UnicodeDecodeError as e:
-                            value = string_bytes
-                            self.logger.error(f"批量读取时无法解码字符串{tag.tagpath}: {e}！")
-
-
-                else:
-                    self.logger.warning(f"未知的数据类型: {tag.data_type}!")
-                    value = tag_data
-
-                # 更新标签值
-                tag.value = value
-                results[tag.tagpath] = value
+            self._parse_entries(data, parser, results, changed)
 
         except Exception as e:
             self.logger.error(f"读取DB{db_number}失败: {e}")
             # 标记这些标签读取失败
-            for tag in tags_list:
-                results[tag.tagpath] = None
+            for entry in entries:
+                results[entry[1]] = None
 
+        if changed:
+            VariableMonitor.batch_update(changed)
         return results
 
+    def _parse_entries(self, data, parser: tuple, results: Dict[str, Any], changed: Optional[list]):
+        """
+        按读取计划的 parser 解析一个读取区间的数据，更新标签值并记录到 results，
+        值发生变化的标签以 (监控器, 新值) 追加到 changed，由调用方统一通知监控器；
+        changed 为 None 时只解析不更新标签值
+        """
+        bulk_struct, bulk_tags, entries = parser
+        # 数值标签：一次 unpack_from 解析出区间内全部数值
+        if bulk_struct is not None:
+            try:
+                values = bulk_struct.unpack_from(data)
+            except struct.error as e:
+                values = (None,) * len(bulk_tags)
+                self.logger.error(f"批量解析{len(bulk_tags)}个数值tag发生错误[{e}]，请检查变量配置是否正确！")
+            for (tag, tagpath), value in zip(bulk_tags, values):
+                if changed is not None and tag._store_value(value):
+                    changed.append((tag.monitor, value))
+                results[tagpath] = value
+
+        # 其余标签（bool、string、与其它标签地址重叠的数值）逐个解析
+        data_view = memoryview(data)
+        for tag, tagpath, relative_offset, size, data_type, parse in entries:
+            if parse is not None:
+                try:
+                    value = parse(data, relative_offset)[0]
+                except Exception as e:
+                    value = None
+                    self.logger.error(f"解析tag：{tagpath}发生错误[{e}]，请检查变量配置是否正确！")
+            elif data_type == 'string':
+                # 字符串数据：2字节头部（最大长度、实际长度）之后为内容，实际长度不超过配置长度
+                actual_length = min(data[relative_offset + 1], size)
+
+                # 在读取缓冲区的视图上直接解码，不复制字符串字节
+                string_bytes = data_view[relative_offset + 2:relative_offset + 2 + actual_length]
+
+                # 解码字符串（尾部半个中文字符由解码器丢弃）
+                try:
+                    value = tag._decode_string(string_bytes)
+                except UnicodeDecodeError as e:
+                    value = bytearray(string_bytes)
+                    self.logger.error(f"批量读取时无法解码字符串{tagpath}: {e}！")
+
+            else:
+                self.logger.warning(f"未知的数据类型: {data_type}!")
+                value = data[relative_offset : relative_offset + size]
+
+            # 更新标签值（只读解析时跳过）
+            if changed is not None and tag._store_value(value):
+                changed.append((tag.monitor, value))
+            results[tagpath] = value
+
     def write_pending_tags(self) -> Dict[str, bool]:
         """批量写入所有待写入的标签值"""
         if self._plc_client_async is None:
@@ -504,110 +609,124 @@ class DBPLCTagManager:
             # 标记这些标签写入失败
             return {}
 
-        # 获取所有有待写入值的标签
-        pending_tags = [tag for tag in self.tags.values() if tag.has_pending_write()]
-        if not pending_tags:
-            return {}
-
-        # 按DB块分组标签
-        grouped_tags = self._group_tags_by_db(pending_tags)
-
+        with self._write_pending_lock:
+            # 一次性取出所有待写入值的快照 {db_number: [(tag, value), ...]}，之后的打包和PLC读写只使用快照，
+            # 期间新设置的待写入值不受影响
+            grouped_pending = {}
+            for tag in list(self.tags.values()):
+                value = tag.get_pending_write_value()
+                if value is not None:
+                    grouped_pending.setdefault(tag.db_number, []).append((tag, value))
+            if not grouped_pending:
+                return {}
+            return self._write_pending_groups(grouped_pending)
+
+    def _write_pending_groups(self, grouped_pending: Dict[int, List[tuple]]) -> Dict[str, bool]:
+        """按DB块分组写入待写入值的快照（调用方持有 _write_pending_lock）"""
         results = {}
 
         # 处理每个分组
-        for db_number, tags in grouped_tags.items():
+        for db_number, pending in grouped_pending.items():
             # 计算写入范围
-            start_offset, end_offset = self._calculate_write_range(tags)
+            start_offset, end_offset = self._calculate_write_range([tag for tag, _ in pending])
             write_size = end_offset - start_offset + 1
+            # 待写入值按地址排序，并标记各字节被待写入标签占用的位（非布尔标签占满整个字节）
+            pending.sort(key=lambda p: p[0].start_offset)
+            owned = bytearray(write_size)
+            for tag, _ in pending:
+                relative_offset = tag.start_offset - start_offset
+                if tag._bit_mask is not None:
+                    owned[relative_offset] |= tag._bit_mask
+                else:
+                    length = tag.size + 2 if tag.data_type == 'string' else tag.size
+                    owned[relative_offset:relative_offset + length] = b'\xff' * length
+
+            # 按连续占用的字节段分别写入，不覆盖段之间未修改的字节
+            index = 0
+            for run in _OWNED_RUN.finditer(owned):
+                run_start, run_end = run.span()
+                run_tags = []
+                while index < len(pending) and pending[index][0].start_offset - start_offset < run_end:
+                    run_tags.append(pending[index])
+                    index += 1
+                ok = self._write_pending_run(db_number, start_offset + run_start, run_end - run_start,
+                                             run_tags, _PARTIAL_BYTE.search(owned, run_start, run_end) is not None)
+                for tag, value in run_tags:
+                    # 写入成功才清除待写入值（写入期间被替换的新值保留），失败的保留到下一周期重试
+                    if ok:
+                        tag._clear_pending_write_value_if(value)
+                    results[tag.tagpath] = ok
 
-            try:
-                # 先读取原始数据
-                result, original_data = self._plc_client_async.readDB_Byte(db_number, start_offset, write_size)
-
-                # 修改数据
-                modified_data = bytearray(original_data)
-
-                for tag in tags:
-                    value = tag.get_pending_write_value()
-                    relative_offset = tag.start_offset - start_offset
-
-                    # 准备要写入的数据
-                    if tag.data_type == 'bool' and tag.bit_index is not None:
-                        # 布尔类型需要特殊处理位操作
-                        self._set_bool_in_bytearray(
-                            modified_data, relative_offset,
-                            tag.bit_index, value
-                        )
-                    elif tag.data_type == 'int':
-                        set_int(modified_data, relative_offset, value)
-                    elif tag.data_type == 'dint':
-                        set_dint(modified_data, relative_offset, value)
-                    elif tag.data_type == 'real':
-                        set_real(modified_data, relative_offset, value)
-                    elif tag.data_type == 'lreal':
-                        set_lreal(modified_data, relative_offset, value)
-                    elif tag.data_type == 'string':
-                        encoding = 'gbk'
-                        # 将字符串编码为字节
-                        try:
-                            string_bytes = value.encode(encoding)
-                        except UnicodeEncodeError as e:
-                            self.logger.error(f"写入字符串{tag.tagpath}时编码出错: {e}")
-                        # 检查长度是否超出限制
-                        max_content_length = tag.size
-                        if len(string_bytes) > max_content_length:
-                            # 截断字符串
-                            truncated_bytes = string_bytes[:max_content_length]
-                            try:
-                                # 尝试解码截断后的字节，确保不会在字符中间截断
-                                truncated_str = truncated_bytes.decode(encoding)
-                                string_bytes = truncated_str.encode(encoding)
-                                self.logger.warning(f"{tag.tagpath}字符串写入时长度超出限制，已截断为: {truncated_str}")
-                            except:
-                                # 如果解码失败，可能出现窃取半个中文字符的问题，尝试去掉末尾字符重试
-                                truncated_str = truncated_bytes[:-1].decode(encoding)
-                                string_bytes = truncated_str.encode(encoding)
-                                self.logger.warning(f"{tag.tagpath}字符串写入时长度超出限制，已截断为: {truncated_str}")
-
-                        # 创建PLC字符串格式
-                        # 西门子字符串格式:
-                        # 第一个字节: 最大长度 (max_length)
-                        # 第二个字节: 实际长度 (actual_length)
-                        # 接着是字符串数据，剩余部分填充0
-                        buffer = bytearray(tag.size + 2)
-                        buffer[0] = tag.size  # 最大长度
-                        buffer[1] = len(string_bytes)  # 实际长度
-
-                        # 复制字符串数据
-                        buffer[2:2 + len(string_bytes)] = string_bytes
-
-                        # 剩余部分填充0（可选，但建议填充以确保一致性）
-                        for i in range(2 + len(string_bytes), tag.size + 2):
-                            buffer[i] = 0
-
-
-                        modified_data[relative_offset : relative_offset+tag.size+2] = buffer
-
-
-
-                    else:
-                        self.logger.warning(f"{tag.tagpath}是未知的数据类型: {tag.data_type}")
-
-                    # 更新标签值并清除待写入值
-                    #tag.value = value
-                    tag.clear_pending_write_value()
-                    results[tag.tagpath] = True
-
-                # 写回数据
-                self._plc_client_async.writeDB_Byte(db_number, start_offset, modified_data)
+        return results
 
-            except Exception as e:
-                self.logger.error(f"批量pending写入DB{db_number}失败: {e}")
-                # 标记这些标签写入失败
-                for tag in tags:
-                    results[tag.tagpath] = False
+    def _write_pending_run(self, db_number: int, run_offset: int, run_size: int, run_tags: list,
+                           needs_read: bool) -> bool:
+        """
+        写入一个连续字节段内的待写入标签
+        段内所有字节都被待写入标签完整覆盖时直接构造数据写入；存在只写部分位的字节（布尔标签）时先读取原始数据再修改
+        """
+        try:
+            if needs_read:
+                # 读取返回的是新建的 bytearray，直接在其上修改
+                result, data = self._plc_client_async.readDB_Byte(db_number, run_offset, run_size)
+                if not result:
+                    raise RuntimeError("读取原始数据失败")
+            else:
+                # 段内每个字节都会被完整覆盖，复用同长度的缓冲区，无需清零
+                data = self._write_buffers.get(run_size)
+                if data is None:
+                    data = self._write_buffers[run_size] = bytearray(run_size)
+
+            # 同一字节内的 bool 先合并为 {相对偏移: [置位掩码, 清零掩码]}，最后每个字节只修改一次
+            bool_masks = {}
+            for tag, value in run_tags:
+                relative_offset = tag.start_offset - run_offset
+
+                # 准备要写入的数据
+                if tag._bit_mask is not None:
+                    masks = bool_masks.get(relative_offset)
+                    if masks is None:
+                        masks = bool_masks[relative_offset] = [0, 0]
+                    masks[0 if value else 1] |= tag._bit_mask
+                elif tag._serialize is not None:
+                    tag._serialize(data, relative_offset, value)
+                elif tag.data_type == 'string':
+                    # 将字符串编码为字节，超出长度限制时截断
+                    try:
+                        string_bytes, truncated = tag._encode_string(value)
+                    except UnicodeEncodeError as e:
+                        self.logger.error(f"写入字符串{tag.tagpath}时编码出错: {e}")
+                        raise
+                    if truncated:
+                        self.logger.warning(f"{tag.tagpath}字符串写入时长度超出限制，已截断为: {tag._decode_string(string_bytes)}")
+
+                    # 创建PLC字符串格式
+                    # 西门子字符串格式:
+                    # 第一个字节: 最大长度 (max_length)
+                    # 第二个字节: 实际长度 (actual_length)
+                    # 接着是字符串数据，剩余部分填充0
+                    # 直接写入段缓冲区（缓冲区可能是复用的或读取的原始数据，剩余部分需显式清零）
+                    content_end = relative_offset + 2 + len(string_bytes)
+                    data[relative_offset] = tag.size  # 最大长度
+                    data[relative_offset + 1] = len(string_bytes)  # 实际长度
+                    # 复制字符串数据
+                    data[relative_offset + 2:content_end] = string_bytes
+                    data[content_end:relative_offset + tag.size + 2] = bytes(tag.size - len(string_bytes))
 
-        return results
+                else:
+                    self.logger.warning(f"{tag.tagpath}是未知的数据类型: {tag.data_type}")
+
+            for relative_offset, (set_mask, clear_mask) in bool_masks.items():
+                data[relative_offset] = (data[relative_offset] & ~clear_mask) | set_mask
+
+            # 写回数据
+            if self._plc_client_async.writeDB_Byte(db_number, run_offset, data) is not True:
+                raise RuntimeError("写入数据失败")
+            return True
+
+        except Exception as e:
+            self.logger.error(f"批量pending写入DB{db_number}.{run_offset}({run_size}字节)失败: {e}")
+            return False
 
     def _group_tags_by_db(self, tags: Optional[List[DBPLCTag]] = None) -> Dict[int, List[DBPLCTag]]:
         """按DB块分组标签"""
@@ -622,12 +741,92 @@ class DBPLCTagManager:
 
         return groups
 
+    def _build_read_plan(self, tags: Optional[List[DBPLCTag]] = None) -> List[tuple]:
+        """生成批量读取计划：每个读取区间附带各标签解析所需的属性，周期读取时直接按计划解析（tags 为 None 时包含所有标签）
+
+        :return: [(db_number, start_offset, read_size, entries, parser), ...]，
+                 entries 为 [(tag, tagpath, relative_offset, size, data_type, parse), ...]，parse 为 None 时按 data_type 单独处理，
+                 parser 见 _build_range_parser
+        """
+        read_plan = []
+        for db_number, start_offset, end_offset, range_tags in self._build_read_ranges(tags):
+            entries = [(tag, tag.tagpath, tag.start_offset - start_offset, tag.size, tag.data_type, tag._parse)
+                       for tag in range_tags]
+            read_plan.append((db_number, start_offset, end_offset - start_offset + 1, entries,
+                              self._build_range_parser(entries)))
+        return read_plan
+
+    def _build_range_parser(self, entries: list) -> tuple:
+        """
+        把读取区间内地址互不重叠的数值标签按偏移量拼成一个 Struct 格式（标签之间的空隙用填充字节 x 跳过），
+        一次 unpack_from 在C层解析出全部数值，不再逐个标签调用解析函数
+
+        :return: (Struct 或 None, [(tag, tagpath), ...] 与 Struct 解析结果一一对应, 需要逐个解析的其余 entries)
+        """
+        fmt = ['>']
+        cursor = 0
+        bulk_tags = []
+        rest = []
+        for entry in sorted(entries, key=lambda e: e[2]):
+            tag, tagpath, relative_offset, size, data_type, parse = entry
+            code = _STRUCT_CODES.get(data_type)
+            if code is None or relative_offset < cursor:
+                rest.append(entry)
+                continue
+            if relative_offset > cursor:
+                fmt.append(f'{relative_offset - cursor}x')
+            fmt.append(code)
+            cursor = relative_offset + struct.calcsize('>' + code)
+            bulk_tags.append((tag, tagpath))
+        bulk_struct = struct.Struct(''.join(fmt)) if bulk_tags else None
+        return bulk_struct, bulk_tags, rest
+
+    def _build_db_read_plan(self, db_number: int) -> tuple:
+        """生成单个DB块的读取计划（整个DB块的标签一次读取）
+
+        :return: (start_offset, read_size, entries, parser)，entries、parser 格式同 _build_read_plan，DB块内没有标签时 entries 为空列表
+        """
+        tags = list(self._db_tags.get(db_number, {}).values())
+        if not tags:
+            return 0, 0, [], (None, [], [])
+        start_offset, end_offset = self._calculate_read_range(tags)
+        entries = [(tag, tag.tagpath, tag.start_offset - start_offset, tag.size, tag.data_type, tag._parse)
+                   for tag in tags]
+        return start_offset, end_offset - start_offset + 1, entries, self._build_range_parser(entries)
+
+    def _build_read_ranges(self, tags: Optional[List[DBPLCTag]] = None) -> List[tuple]:
+        """按DB块分组后，将地址相邻（间隙不超过READ_GAP_MAX字节）的标签合并为一个读取区间
+
+        :return: [(db_number, start_offset, end_offset, tags), ...]
+        """
+        read_ranges = []
+        for db_number, db_tags in self._group_tags_by_db(tags).items():
+            db_tags = sorted(db_tags, key=lambda t: t.start_offset)
+            range_tags = []
+            range_start = range_end = None
+            for tag in db_tags:
+                tag_start, tag_end = tag.start_offset, tag._end_offset
+                if range_tags and tag_start - range_end - 1 > self.READ_GAP_MAX:
+                    read_ranges.append((db_number, range_start, range_end, range_tags))
+                    range_tags = []
+                if not range_tags:
+                    range_start, range_end = tag_start, tag_end
+                else:
+                    range_end = max(range_end, tag_end)
+                range_tags.append(tag)
+            if range_tags:
+                read_ranges.append((db_number, range_start, range_end, range_tags))
+        return read_ranges
+
     def _calculate_read_range(self, tags: List[DBPLCTag]) -> tuple:
         """计算读取的起始和结束偏移量"""
-        start_offset = min([tag.start_offset for tag in tags])
-        end_offset = max([tag.start_offset + tag.size - 1 if tag.data_type != "string"
-                          else tag.start_offset + tag.size + 1
-                          for tag in tags])
+        start_offset = tags[0].start_offset
+        end_offset = tags[0]._end_offset
+        for tag in tags:
+            if tag.start_offset < start_offset:
+                start_offset = tag.start_offset
+            if tag._end_offset > end_offset:
+                end_offset = tag._end_offset
         return start_offset, end_offset
 
     def _calculate_write_range(self, tags: List[DBPLCTag]) -> tuple:
@@ -643,26 +842,45 @@ class DBPLCTagManager:
             data[byte_offset] &= ~(1 << bit_index)
 
     def background_async_read(self):
-        print("====开始执行后台任务读取=====")
         self.logger.info(f"开始后台定时批量读取tag任务background_async_read，周期设定：{self.interval}s..")
+        # 按绝对截止时间（单调时钟）排期，读取耗时不会累积成周期漂移
+        deadline = time.monotonic()
         while self._read_running:
-            self.read_all_tags()
-            print("后台任务读取while循环中...")
-            time.sleep(self.interval)
+            try:
+                self.read_all_tags()
+            except Exception as e:
+                self.logger.error(f"后台定时批量读取tag任务执行失败: {e}")
+            deadline = self._wait_next_cycle(deadline, self._read_stop_event)
         self.logger.warning(f"后台定时批量读取tag任务，已停止！")
 
     def background_async_write(self):
         self.logger.info(f"开始后台定时批量异步写入tag任务background_async_write，周期设定：{self.interval}s..")
+        # 与读取任务相同，按绝对截止时间排期
+        deadline = time.monotonic()
         while self._write_running:
-            self.write_pending_tags()
-            time.sleep(self.interval)
+            try:
+                self.write_pending_tags()
+            except Exception as e:
+                self.logger.error(f"后台定时批量写入tag任务执行失败: {e}")
+            deadline = self._wait_next_cycle(deadline, self._write_stop_event)
         self.logger.warning(f"后台定时批量异步写入tag任务，已停止！")
 
+    def _wait_next_cycle(self, deadline: float, stop_event: threading.Event) -> float:
+        """等待到下一周期的截止时间，stop_event 置位时立即返回；返回下一周期的截止时间"""
+        deadline += self.interval
+        delay = deadline - time.monotonic()
+        if delay > 0:
+            stop_event.wait(delay)
+            return deadline
+        # 已错过本周期：合并错过的周期，从当前时刻重新排期，不连续补读
+        return time.monotonic()
+
     def start_background_async_read(self):
         """启动批量读取tag线程"""
         with self._lock:
             if self._background_async_read_thread is None or not self._background_async_read_thread.is_alive():
                 self._read_running = True
+                self._read_stop_event.clear()
                 self._background_async_read_thread = threading.Thread(
                     target=self.background_async_read,
                     name=f"class._background_async_read_thread",
@@ -675,6 +893,7 @@ class DBPLCTagManager:
         """停止批量读取tag线程"""
         with self._lock:
             self._read_running = False
+            self._read_stop_event.set()
 
         # 等待线程结束
         if self._background_async_read_thread and self._background_async_read_thread.is_alive():
@@ -687,6 +906,7 @@ class DBPLCTagManager:
         with self._lock:
             if self._background_async_write_thread is None or not self._background_async_write_thread.is_alive():
                 self._write_running = True
+                self._write_stop_event.clear()
                 self._background_async_write_thread = threading.Thread(
                     target=self.background_async_write,
                     name=f"class._background_async_write_thread",
@@ -699,6 +919,7 @@ class DBPLCTagManager:
         """停止后台批量写tag线程"""
         with self._lock:
             self._write_running = False
+            self._write_stop_event.set()
 
         # 等待线程结束
         if self._background_async_write_thread and self._background_async_write_thread.is_alive():
@@ -725,44 +946,18 @@ if __name__ == "__main__":
 
     # 定义标签配置
     tag_definitions = [
-        {
-            "tagpath" : "Motor1_Status",
-            "name": "Motor1_Status",
-            "db_number": 101,
-            "start_offset": 0,
-            "size": 1,
-            "data_type": "bool",
-            "bit_index": 0,
-            "description": "电机1状态"
-        },
-        {
-            "tagpath": "Motor1_Speed",
-            "name": "Motor1_Speed",
-            "db_number": 101,
-            "start_offset": 2,
-            "size": 2,
-            "data_type": "int",
-            "description": "电机1速度"
-        },
-        {
-            "tagpath": "path-Temperature",
-            "name": "Temperature",
-            "db_number": 101,
-            "config_monitor": 1,
-            "start_offset": 4,
-            "size": 4,
-            "data_type": "real",
-            "description": "温度"
-        },
-        {
-            "tagpath": "Machine_Name",
-            "name": "Machine_Name",
-            "db_number": 102,
-            "start_offset": 0,
-            "size": 20,
-            "data_type": "string",
-            "description": "机器名称"
-        }
+        TagDef(plc="", group="", tagpath="Motor1_Status", name="Motor1_Status", description="电机1状态",
+               default_value=None, config_monitor=0, data_type="bool",
+               db_number=101, start_offset=0, bit_index=0, size=1),
+        TagDef(plc="", group="", tagpath="Motor1_Speed", name="Motor1_Speed", description="电机1速度",
+               default_value=None, config_monitor=0, data_type="int",
+               db_number=101, start_offset=2, bit_index=None, size=2),
+        TagDef(plc="", group="", tagpath="path-Temperature", name="Temperature", description="温度",
+               default_value=None, config_monitor=1, data_type="real",
+               db_number=101, start_offset=4, bit_index=None, size=4),
+        TagDef(plc="", group="", tagpath="Machine_Name", name="Machine_Name", description="机器名称",
+               default_value=None, config_monitor=0, data_type="string",
+               db_number=102, start_offset=0, bit_index=None, size=20),
     ]
 
     # 初始化标签管理器
@@ -1,33 +1,41 @@
 from flask import Flask
 from flask_cors import CORS
+try:
+    from flask_compress import Compress
+except ImportError:  # 未安装 flask-compress 时不压缩响应
+    Compress = None
 from gateway.plc_api.app.config import config
 from gateway.plc_api.app.routes import plc, health
+from gateway.plc_api.app.plc_pool import init_pool
 
-from gateway.plc_api.app.utils.response import error_response
+from gateway.plc_api.app.utils.response import error_response, build_success_bodies
+from gateway.plc_api.app.utils.api_request import ApiRequest
 
 
 def create_app(config_name='default'):
     """应用工厂函数"""
     app = Flask(__name__)
+    # 请求体用 orjson / MessagePack 解码
+    app.request_class = ApiRequest
 
     # 加载配置
     app.config.from_object(config[config_name])
-
-    # 确保中文正确显示的配置
-    app.config['JSON_AS_ASCII'] = False
-    app.config['JSONIFY_MIMETYPE'] = 'application/json; charset=utf-8'
-
+    plc.MAX_BATCH_SIZE = app.config['MAX_BATCH_SIZE']
+    plc.READ_CACHE_TTL = app.config['READ_CACHE_MS'] / 1000
+    init_pool(app.config['PLC_POOL_SIZE'])
+    # 健康检查的响应内容只取决于配置，启动时序列化一次
+    app.extensions['health_bodies'] = build_success_bodies({
+        'status': 'healthy',
+        'service': 'PLC API',
+        'version': app.config['API_VERSION']
+    }, "服务正常")
 
     # 启用CORS
     CORS(app)
 
-    # 全局响应头设置
-    @app.after_request
-    def after_request(response):
-        """设置响应头确保中文正确显示"""
-        if response.mimetype.startswith('application/json'):
-            response.headers['Content-Type'] = 'application/json; charset=utf-8'
-        return response
+    # 按 Accept-Encoding 压缩响应（gzip/br）
+    if Compress is not None:
+        Compress(app)
 
     # 注册蓝图
     app.register_blueprint(plc.bp)
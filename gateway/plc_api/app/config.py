@@ -14,9 +14,22 @@ class Config:
     JSONIFY_PRETTYPRINT_REGULAR = False  # 生产环境禁用美化输出
     MAX_CONTENT_LENGTH = 16 * 1024 * 1024  # 最大请求大小16MB
 
+    # 响应压缩配置（安装 flask-compress 时生效），数值批量响应重复字段多，压缩率高；最快压缩级别，低于 500 字节不压缩
+    COMPRESS_MIMETYPES = ['application/json', 'application/x-msgpack']
+    COMPRESS_LEVEL = 1
+    COMPRESS_BR_LEVEL = 1
+    COMPRESS_MIN_SIZE = 500
+    COMPRESS_STREAMS = False  # 流式批量响应保持逐段发送
+
     # 批量操作配置
     MAX_BATCH_SIZE = int(os.environ.get('MAX_BATCH_SIZE', 100))  # 批量操作最大标签数
 
+    # 读取缓存配置
+    READ_CACHE_MS = float(os.environ.get('PLC_READ_CACHE_MS', 50))  # 标签值缓存有效期（毫秒），0 表示不缓存
+
+    # PLC链接池配置：每个池链接都占用 PLC 的一个 S7 通讯连接，加上网关的同步/异步链接及 HMI 等不能超过 CPU 的连接上限
+    PLC_POOL_SIZE = int(os.environ.get('PLC_POOL_SIZE', 3))  # API读取专用的PLC链接数，0 表示共用同步链接
+
 
 class DevelopmentConfig(Config):
     DEBUG = True
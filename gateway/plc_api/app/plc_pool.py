@@ -0,0 +1,68 @@
+import logging
+import queue
+from contextlib import contextmanager
+from typing import Optional
+
+import gateway.config.globals as PLC
+from gateway.plc.client import PLCClient
+from gateway.plc.log import AppLogger
+
+# API 读取专用的PLC链接池：并发请求各自取一个链接，PLC往返可以重叠，不再排队等待同一个链接
+# 为 None 时（未初始化或池大小为 0）所有请求共用 PLC.DB 的同步链接
+# 注意：池中每个链接都占用 PLC 的一个 S7 通讯连接（与同步/异步链接、HMI、编程器共用 CPU 的连接资源），
+# 池大小加上网关已有的链接数不能超过 CPU 可用的 S7 连接数
+_pool: Optional[queue.Queue] = None
+_pool_size = 0
+# 取链接的等待超时（秒），超时后退回共用的同步链接
+ACQUIRE_TIMEOUT = 1.0
+
+
+def init_pool(size: int):
+    """
+    按全局同步链接的配置预先建立 size 个轻量PLC链接：不启动监控/心跳线程，使用前按需重连，
+    日志写入单独的文件且只记录警告以上级别（S7-1500 可用的链接数有限，池不宜过大）
+    """
+    global _pool, _pool_size
+    if size <= 0 or PLC.S7 is None or _pool is not None:
+        return
+    logger = AppLogger('plc_api_pool.log', "logs/client", logging.WARNING)
+    pool = queue.Queue(maxsize=size)
+    for _ in range(size):
+        pool.put(PLCClient(PLC.S7.config_path, logger, monitor=False))
+    _pool_size = size
+    _pool = pool
+
+
+def close_pool():
+    """停用链接池并关闭其中的PLC链接，正在使用的链接等其放回后关闭（最多等待 ACQUIRE_TIMEOUT 秒）"""
+    global _pool, _pool_size
+    pool, size = _pool, _pool_size
+    # 先停用，之后的请求直接使用共用的同步链接
+    _pool, _pool_size = None, 0
+    if pool is None:
+        return
+    for _ in range(size):
+        try:
+            client = pool.get(timeout=ACQUIRE_TIMEOUT)
+        except queue.Empty:
+            break
+        client.close()
+
+
+@contextmanager
+def acquire():
+    """取出一个池中的PLC链接，用完放回；链接池未启用、等待超时或链接重连失败时返回 None，由调用方使用默认链接"""
+    pool = _pool
+    if pool is None:
+        yield None
+        return
+    try:
+        client = pool.get(timeout=ACQUIRE_TIMEOUT)
+    except queue.Empty:
+        yield None
+        return
+    try:
+        # 池中链接没有监控线程，取出时确认链接可用，断开则立即重连
+        yield client if client.ensure_connected() else None
+    finally:
+        pool.put(client)
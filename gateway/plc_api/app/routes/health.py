@@ -1,14 +1,10 @@
 from flask import Blueprint, current_app
-from gateway.plc_api.app.utils.response import success_response
+from gateway.plc_api.app.utils.response import prebuilt_response
 
 bp = Blueprint('health', __name__)
 
 
 @bp.route('/health', methods=['GET'])
 def health_check():
-    """健康检查端点"""
-    return success_response({
-        'status': 'healthy',
-        'service': 'PLC API',
-        'version': current_app.config['API_VERSION']
-    }, "服务正常")
+    """健康检查端点（响应体在 create_app 中预先序列化）"""
+    return prebuilt_response(current_app.extensions['health_bodies'])
@@ -1,51 +1,110 @@
-from flask import Blueprint, request, current_app
+import logging
+import re
+import time
+from typing import Any, Dict, Tuple
 
-from gateway.config.globals import PLC
-from gateway.plc_api.app.utils.response import success_response, error_response
+from flask import Blueprint, request
+
+import gateway.config.globals as PLC
+from gateway.plc_api.app.plc_pool import acquire
+from gateway.plc_api.app.utils.response import success_response, error_response, wants_msgpack, stream_success_response
 from gateway.plc_api.app.utils.validation import validate_tag_paths, validate_write_data
 
 
 # 创建蓝图
 bp = Blueprint('plc', __name__, url_prefix='/api/plc')
 logger = PLC.LOG_PLC_API
+# 批量操作最大标签数：由 create_app 在加载配置后写入，避免每个请求都经 current_app 代理查配置
+MAX_BATCH_SIZE = 100
+# 标签值缓存有效期（秒）：多个客户端短时间内轮询同一批标签时直接返回缓存值，不再访问PLC；由 create_app 写入
+READ_CACHE_TTL = 0.05
+# 标签值缓存 {标签路径: (读取时刻 time.monotonic(), 值)}
+_read_cache: Dict[str, Tuple[float, Any]] = {}
+# 写入计数，每次写入后递增：读取期间发生过写入时，本次读取结果可能是写入前的旧值，不再放入缓存
+_write_gen = 0
+# 按逗号拆分 tags 参数并去掉各标签两侧的空白，一次C层拆分完成
+_split_tags = re.compile(r'\s*,\s*').split
 
 
 # 假设这是您已经实现的PLC读写函数
 def internal_read_tags(tag_paths):
     """内部PLC读取函数 - 由您实现"""
-    # 这里应该调用您已经实现的PLC读取功能
+    now = time.monotonic()
     results = {}
-    for tag_path in tag_paths:
-        value = PLC.DB.get_tag(tag_path).value
-        results[tag_path] = value
+    misses = []
+    # 重复的标签只查一次缓存、只读一次PLC（去重并保持请求顺序），响应中每个标签只出现一次
+    for tag_path in dict.fromkeys(tag_paths):
+        cached = _read_cache.get(tag_path)
+        if cached is not None and now - cached[0] < READ_CACHE_TTL:
+            results[tag_path] = cached[1]
+        else:
+            results[tag_path] = None  # 占位，保持请求顺序
+            misses.append(tag_path)
+
+    if misses:
+        generation = _write_gen
+        # 未命中缓存的标签合并为读取区间，一次往返从PLC实时读取（使用链接池中的链接，并发请求互不等待）
+        with acquire() as plc_client:
+            read_results = PLC.DB.read_tags(misses, plc_client)
+        # 缓存时刻取读取完成的时刻；读取期间有写入时只返回结果、不缓存
+        store = generation == _write_gen
+        read_at = time.monotonic()
+        for tag_path, value in read_results.items():
+            results[tag_path] = value
+            # 读取失败的标签不缓存，下次请求重新读取
+            if store and value is not None:
+                _read_cache[tag_path] = (read_at, value)
     return results
 
 
 def internal_write_tags(tag_values):
     """内部PLC写入函数 - 由您实现"""
+    global _write_gen
     # 这里应该调用您已经实现的PLC写入功能
-    results = {}
+    db = PLC.DB
+    write_tag = db.write_tag
     for tag_path, value in tag_values.items():
         # 伪代码: success = your_plc_write_function(tag_path, value)
-        PLC.DB.write_tag(tag_path, value, False)
-    results = PLC.DB.write_pending_tags()
+        write_tag(tag_path, value, False)
+    results = db.write_pending_tags()
+    # 写入后缓存值已过时，下次读取直接访问PLC；先递增写入计数，与本次写入重叠的读取不再回填旧值
+    _write_gen += 1
+    for tag_path in tag_values:
+        _read_cache.pop(tag_path, None)
     return results
 
 
 
+def _log_request(op: str, tag_count: int, start: float):
+    """每个请求只记录一条 key=value 格式的汇总日志（操作、标签数、耗时），完整出入参只在调试级别记录"""
+    if logger.isEnabledFor(logging.INFO):
+        logger.info("api=%s tags=%d elapsed_ms=%.1f", op, tag_count, (time.perf_counter() - start) * 1000)
+
+
 @bp.route('/read', methods=['GET'])
 def read_tags():
     """批量读取PLC标签值"""
+    start = time.perf_counter()
     try:
 
-        logger.info(f"API：读取tag请求，入参: {request.args.to_dict()}")
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("API：读取tag请求，入参: %s", request.args.to_dict())
         # 获取标签路径参数
         tags_param = request.args.get('tags')
         if not tags_param:
             return error_response("缺少tags参数")
 
+        # 检查批量大小限制：标签数等于逗号数加一，超限时不再拆分和验证
+        max_batch_size = MAX_BATCH_SIZE
+        tag_count = tags_param.count(',') + 1
+        if tag_count > max_batch_size:
+            return error_response(
+                f"批量读取标签数量超过限制: {tag_count} > {max_batch_size}",
+                code=413
+            )
+
         # 解析标签路径
-        tag_paths = [tag.strip() for tag in tags_param.split(',')]
+        tag_paths = _split_tags(tags_param.strip())
         if not tag_paths:
             return error_response("标签列表为空")
 
@@ -54,16 +113,9 @@ def read_tags():
         if not is_valid:
             return error_response(f"无效的标签路径: {invalid_paths}")
 
-        # 检查批量大小限制
-        max_batch_size = current_app.config['MAX_BATCH_SIZE']
-        if len(tag_paths) > max_batch_size:
-            return error_response(
-                f"批量读取标签数量超过限制: {len(tag_paths)} > {max_batch_size}",
-                code=413
-            )
-
         # 调用内部PLC读取函数
         results = internal_read_tags(tag_paths)
+        _log_request('read', len(tag_paths), start)
 
         return success_response(results, "读取成功")
 
@@ -75,29 +127,32 @@ def read_tags():
 @bp.route('/write', methods=['POST'])
 def write_tags():
     """批量写入PLC标签值"""
+    start = time.perf_counter()
     try:
         # 获取JSON数据
         data = request.get_json()
 
-        logger.info(f"API：写入tag请求，入参: {data}")
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("API：写入tag请求，入参: %s", data)
         if not data:
             return error_response("请求体必须是JSON格式")
 
-        # 验证数据格式
-        is_valid, invalid_keys = validate_write_data(data)
-        if not is_valid:
-            return error_response(f"无效的标签路径: {invalid_keys}")
-
-        # 检查批量大小限制
-        max_batch_size = current_app.config['MAX_BATCH_SIZE']
-        if len(data) > max_batch_size:
+        # 检查批量大小限制（先于逐个标签的验证）
+        max_batch_size = MAX_BATCH_SIZE
+        if isinstance(data, dict) and len(data) > max_batch_size:
             return error_response(
                 f"批量写入标签数量超过限制: {len(data)} > {max_batch_size}",
                 code=413
             )
 
+        # 验证数据格式
+        is_valid, invalid_keys = validate_write_data(data)
+        if not is_valid:
+            return error_response(f"无效的标签路径: {invalid_keys}")
+
         # 调用内部PLC写入函数
         results = internal_write_tags(data)
+        _log_request('write', len(data), start)
 
         #返空检查
         if len(results) == 0 :
@@ -105,9 +160,9 @@ def write_tags():
                 "所有标签写入失败！",
                 errors=[]
             )
-        # 检查写入结果
-        failed_writes = {tag: success for tag, success in results.items() if not success}
-        if failed_writes:
+        # 检查写入结果：all() 在C层扫描，全部成功时不再构造失败字典
+        if not all(results.values()):
+            failed_writes = {tag: success for tag, success in results.items() if not success}
             return error_response(
                 "部分标签写入失败",
                 errors=failed_writes
@@ -120,13 +175,39 @@ def write_tags():
         return error_response("写入PLC标签失败")
 
 
+def _batch_results(read_tags, write_data):
+    """
+    依次执行批量读取、写入，各产出一项 (键, 结果) 供流式响应使用
+    响应已开始发送，出错时不能再改为错误响应：失败的部分按单个标签失败的格式返回（读取为 None，写入为 False）
+    """
+    read_results = {}
+    if read_tags:
+        try:
+            read_results = internal_read_tags(read_tags)
+        except Exception as e:
+            logger.error(f"批量操作读取PLC标签错误: {e}")
+            read_results = dict.fromkeys(read_tags)
+    yield 'read', read_results
+
+    write_results = {}
+    if write_data:
+        try:
+            write_results = internal_write_tags(write_data)
+        except Exception as e:
+            logger.error(f"批量操作写入PLC标签错误: {e}")
+            write_results = dict.fromkeys(write_data, False)
+    yield 'write', write_results
+
+
 @bp.route('/batch', methods=['POST'])
 def batch_operations():
     """批量读写操作（读写混合）"""
+    start = time.perf_counter()
     try:
 
         data = request.get_json()
-        logger.info(f"API：混合操作tag请求，入参: {request.data}")
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("API：混合操作tag请求，入参: %s", request.data)
 
         if not data:
             return error_response("请求体必须是JSON格式")
@@ -135,6 +216,15 @@ def batch_operations():
         read_tags = data.get('read', [])
         write_data = data.get('write', {})
 
+        # 检查总操作数量限制（先于逐个标签的验证）
+        max_batch_size = MAX_BATCH_SIZE
+        total_operations = len(read_tags) + len(write_data)
+        if total_operations > max_batch_size:
+            return error_response(
+                f"批量操作数量超过限制: {total_operations} > {max_batch_size}",
+                code=413
+            )
+
         # 验证读取标签
         is_valid, invalid_reads = validate_tag_paths(read_tags)
         if not is_valid:
@@ -145,14 +235,11 @@ def batch_operations():
         if not is_valid:
             return error_response(f"无效的写入标签路径: {invalid_writes}")
 
-        # 检查总操作数量限制
-        max_batch_size = current_app.config['MAX_BATCH_SIZE']
-        total_operations = len(read_tags) + len(write_data)
-        if total_operations > max_batch_size:
-            return error_response(
-                f"批量操作数量超过限制: {total_operations} > {max_batch_size}",
-                code=413
-            )
+        # MessagePack 客户端：读取结果一返回就先发送，再执行写入
+        if wants_msgpack():
+            # 流式响应的读写在发送过程中执行，这里记录的是开始响应前的耗时
+            _log_request('batch', total_operations, start)
+            return stream_success_response(_batch_results(read_tags, write_data), 2, "批量操作成功")
 
         # 执行读取操作
         read_results = {}
@@ -170,6 +257,7 @@ def batch_operations():
             'write': write_results
         }
 
+        _log_request('batch', total_operations, start)
         return success_response(response_data, "批量操作成功")
 
     except Exception as e:
@@ -0,0 +1,34 @@
+from flask import Request
+
+from gateway.plc_api.app.utils.response import MSGPACK_MIMETYPE, msgpack, orjson
+
+
+class _OrjsonLoader:
+    """供 Request.json_module 使用：只需要 loads，解码失败抛出的 orjson.JSONDecodeError 是 ValueError 的子类"""
+    loads = staticmethod(orjson.loads) if orjson is not None else None
+
+
+class ApiRequest(Request):
+    """
+    API 请求对象：JSON 请求体用 orjson 解码（未安装时仍用标准库）；
+    Content-Type 为 application/x-msgpack 的请求体用 MessagePack 解码，get_json() 返回同样的数据结构
+    """
+    if orjson is not None:
+        json_module = _OrjsonLoader
+
+    def get_json(self, force=False, silent=False, cache=True):
+        if msgpack is None or self.mimetype != MSGPACK_MIMETYPE:
+            return super().get_json(force=force, silent=silent, cache=cache)
+
+        # 缓存方式与 JSON 相同：_cached_json 为 (非静默结果, 静默结果)
+        if cache and self._cached_json[silent] is not Ellipsis:
+            return self._cached_json[silent]
+        try:
+            rv = msgpack.unpackb(self.get_data(cache=cache), raw=False)
+        except ValueError as e:
+            if silent:
+                return None
+            return self.on_json_loading_failed(e)
+        if cache:
+            self._cached_json = (rv, rv)
+        return rv
@@ -1,9 +1,50 @@
-from flask import jsonify
-from typing import Any
-from gateway.config.globals import PLC
+import json
+import logging
+from flask import request, has_request_context, current_app, stream_with_context
+from typing import Any, Iterable, Tuple
+import gateway.config.globals as PLC
+
+try:
+    import msgpack
+except ImportError:  # 未安装 msgpack 时只提供 JSON 响应
+    msgpack = None
+
+try:
+    import orjson
+except ImportError:  # 未安装 orjson 时退回标准库 json
+    orjson = None
 
 logger = PLC.LOG_PLC_API
 
+JSON_MIMETYPE = 'application/json'
+MSGPACK_MIMETYPE = 'application/x-msgpack'
+# JSON 排在前面：Accept 为 */* 或未指定时（浏览器等）仍返回 JSON，只有明确接受 MessagePack 的客户端才切换
+_RESPONSE_MIMETYPES = [JSON_MIMETYPE, MSGPACK_MIMETYPE]
+# 响应头直接带上 charset，中文无需 after_request 再改写
+JSON_CONTENT_TYPE = 'application/json; charset=utf-8'
+
+
+def _dumps_json(response: dict) -> bytes:
+    """序列化为 UTF-8 JSON：优先用 orjson（C 实现，比标准库快数倍），中文不转义"""
+    if orjson is not None:
+        return orjson.dumps(response)
+    return json.dumps(response, ensure_ascii=False).encode('utf-8')
+
+
+
+def wants_msgpack() -> bool:
+    """当前请求是否协商为 MessagePack 响应"""
+    return (msgpack is not None and has_request_context()
+            and request.accept_mimetypes.best_match(_RESPONSE_MIMETYPES) == MSGPACK_MIMETYPE)
+
+
+def _make_response(response: dict, code: int = 200):
+    """按请求的 Accept 头协商响应格式：MessagePack（数值编码更紧凑、序列化更快）或 JSON"""
+    if wants_msgpack():
+        return current_app.response_class(msgpack.packb(response, use_bin_type=True),
+                                          status=code, mimetype=MSGPACK_MIMETYPE)
+    return current_app.response_class(_dumps_json(response), status=code, mimetype=JSON_CONTENT_TYPE)
+
 def success_response(data: Any = None, message: str = "操作成功"):
     """成功响应格式"""
     response = {
@@ -11,8 +52,10 @@ def success_response(data: Any = None, message: str = "操作成功"):
         "message": message,
         "data": data
     }
-    logger.info(f"API：处理tag成功，响应请求，出参: {response}")
-    return jsonify(response)
+    # 出参包含全部标签值，仅在调试级别记录
+    if logger.isEnabledFor(logging.DEBUG):
+        logger.debug("API：处理tag成功，响应请求，出参: %s", response)
+    return _make_response(response)
 
 def error_response(message: str = "操作失败", errors: Any = None, code: int = 400):
     """错误响应格式"""
@@ -21,5 +64,45 @@ def error_response(message: str = "操作失败", errors: Any = None, code: int
         "message": message,
         "errors": errors
     }
-    logger.info(f"API：处理tag失败，响应请求，出参: {response}")
-    return jsonify(response), code
\ No newline at end of file
+    # 出参包含全部标签值，仅在调试级别记录
+    if logger.isEnabledFor(logging.DEBUG):
+        logger.debug("API：处理tag失败，响应请求，出参: %s", response)
+    return _make_response(response, code)
+
+def build_success_bodies(data: Any = None, message: str = "操作成功") -> dict:
+    """预先序列化内容固定的成功响应，返回 {mimetype: 响应体bytes}，供 prebuilt_response 直接返回"""
+    response = {
+        "success": True,
+        "message": message,
+        "data": data
+    }
+    bodies = {JSON_CONTENT_TYPE: _dumps_json(response)}
+    if msgpack is not None:
+        bodies[MSGPACK_MIMETYPE] = msgpack.packb(response, use_bin_type=True)
+    return bodies
+
+
+def prebuilt_response(bodies: dict):
+    """按 Accept 头从 build_success_bodies 的结果中取出预先序列化的响应体，不再构造和序列化字典"""
+    mimetype = MSGPACK_MIMETYPE if wants_msgpack() else JSON_CONTENT_TYPE
+    return current_app.response_class(bodies[mimetype], mimetype=mimetype)
+
+
+def stream_success_response(data_items: Iterable[Tuple[str, Any]], size: int, message: str = "操作成功"):
+    """
+    以 MessagePack 流式返回成功响应（调用方需先确认 wants_msgpack()），解码结果与 success_response 相同
+    data 的 size 个键值对由 data_items 逐个产出，每产出一项立即编码发送，不必等全部结果到齐再整体序列化
+    """
+    packer = msgpack.Packer(use_bin_type=True)
+
+    def generate():
+        # 外层 {"success": True, "message": ..., "data": {...}}，data 的各键值随结果产出依次编码
+        yield b''.join((packer.pack_map_header(3), packer.pack("success"), packer.pack(True),
+                        packer.pack("message"), packer.pack(message),
+                        packer.pack("data"), packer.pack_map_header(size)))
+        for key, value in data_items:
+            if logger.isEnabledFor(logging.DEBUG):
+                logger.debug("API：处理tag成功，流式响应，出参[%s]: %s", key, value)
+            yield packer.pack(key) + packer.pack(value)
+
+    return current_app.response_class(stream_with_context(generate()), mimetype=MSGPACK_MIMETYPE)
@@ -1,5 +1,5 @@
 from typing import List, Dict, Any, Tuple
-from gateway.config.globals import PLC
+import gateway.config.globals as PLC
 
 def validate_tag_path(tag_path: str) -> bool:
     """验证标签路径格式"""
@@ -9,12 +9,11 @@ def validate_tag_path(tag_path: str) -> bool:
 
 def validate_tag_paths(tag_paths: List[str]) -> Tuple[bool, List[str]]:
     """验证多个标签路径"""
-    invalid_paths = []
-    for tag_path in tag_paths:
-        if not validate_tag_path(tag_path):
-            invalid_paths.append(tag_path)
+    # 标签表是字典，每个标签一次哈希查找；循环外取出字典，省去逐个调用 validate_tag_path 的开销
+    tags = PLC.DB.tags
+    invalid_paths = [tag_path for tag_path in tag_paths if tag_path not in tags]
 
-    return len(invalid_paths) == 0, invalid_paths
+    return not invalid_paths, invalid_paths
 
 
 def validate_write_data(data: Dict[str, Any]) -> Tuple[bool, List[str]]:
@@ -22,9 +21,7 @@ def validate_write_data(data: Dict[str, Any]) -> Tuple[bool, List[str]]:
     if not isinstance(data, dict):
         return False, ["数据必须是字典格式"]
 
-    invalid_keys = []
-    for key, value in data.items():
-        if not validate_tag_path(key):
-            invalid_keys.append(key)
+    tags = PLC.DB.tags
+    invalid_keys = [key for key in data if key not in tags]
 
-    return len(invalid_keys) == 0, invalid_keys
\ No newline at end of file
+    return not invalid_keys, invalid_keys
\ No newline at end of file
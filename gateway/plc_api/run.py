@@ -1,19 +1,31 @@
 import os
 from threading import Thread
 
-from gateway.config.globals import PLC
+import gateway.config.globals as PLC
 from gateway.plc_api.app import create_app
 
+try:
+    from waitress import serve
+except ImportError:  # 未安装 waitress 时退回 Flask 自带服务器
+    serve = None
+
 # 创建应用实例
 app = create_app(os.environ.get('FLASK_CONFIG', 'default'))
 logger = PLC.LOG_PLC_API
 
 def run_flask():
-    # 启动开发服务器
     host = os.environ.get('FLASK_HOST', '0.0.0.0')
     port = int(os.environ.get('FLASK_PORT', 5000))
-    app.run(host=host, port=port, debug=False)
+    # 处理请求的线程数：多个请求的PLC往返可以重叠等待
+    threads = int(os.environ.get('FLASK_THREADS', 8))
+    # 服务启动后一直阻塞，启动日志需在此之前记录
     logger.info(f'API Server已启动:{host}:{port}')
+    if serve is not None:
+        # 生产级 WSGI 服务器（支持 Windows），固定大小的工作线程池处理请求
+        serve(app, host=host, port=port, threads=threads)
+    else:
+        # 开发服务器：每个请求一个线程
+        app.run(host=host, port=port, debug=False, threaded=True)
 
 def run_api():
     # 在新线程中运行Flask
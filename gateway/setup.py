@@ -16,6 +16,11 @@ if __name__ == '__main__':
         '--add-data=plc_api;plc_api',  # 添加plc_api包
         '--hidden-import=plc',  # 确保plc包被包含
         '--hidden-import=plc_api',  # 确保plc_api包被包含
+        '--hidden-import=waitress',  # API服务器（run.py 中可选导入）
+        '--hidden-import=flask_compress',  # API响应压缩（可选导入）
+        '--collect-submodules=plc_api',  # 收集plc_api的全部子模块
+        '--exclude-module=tkinter',  # 未使用的GUI库，减小包体积、缩短启动解压时间
+        '--optimize=2',  # 字节码按 -OO 编译：去掉文档字符串和断言（代码中未依赖二者）
         '--paths=.',  # 添加当前目录到Python路径
     ]
 